@@ -1,6 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.service.facade import facade
+from app.service.nlp_preprocessor import NLP_PROFILES
 
 api = Namespace('audit', description='Audit operations for GDPR compliance')
 
@@ -14,6 +15,11 @@ audit_model = api.model('Audit', {
         required=False,
         description='Run Perplexity AI on this audit',
         default=True
+    ),
+    'nlp_profile': fields.String(
+        required=False,
+        description='NLP stages to run: fast (embeddings only), standard (+ tokens/NER), deep (+ sentiment)',
+        enum=list(NLP_PROFILES)
     )
 })
 
@@ -33,8 +39,9 @@ class UserAudits(Resource):
         payload = api.payload
         target = payload['target']
         run_perplexity = payload.get('run_perplexity', True)
+        nlp_profile = payload.get('nlp_profile')
 
-        audit = facade.create_audit(current_user_id, target, run_perplexity=run_perplexity)
+        audit = facade.create_audit(current_user_id, target, run_perplexity=run_perplexity, nlp_profile=nlp_profile)
         if not audit:
             return {'error': 'Audit creation failed'}, 500
 
@@ -79,8 +86,11 @@ class SingleAudit(Resource):
         payload = api.payload
         new_target = payload['target']
         run_perplexity = payload.get('run_perplexity', True)
+        nlp_profile = payload.get('nlp_profile')
 
-        updated_audit = facade.create_audit(current_user_id, new_target, run_perplexity=run_perplexity)
+        updated_audit = facade.create_audit(
+            current_user_id, new_target, run_perplexity=run_perplexity, nlp_profile=nlp_profile
+        )
         if not updated_audit:
             return {'error': 'Audit update failed'}, 500
 
@@ -156,6 +156,15 @@ class AuditRepository(SQLAlchemyRepository):
         with Session(engine) as session:
             return session.query(Audit).filter_by(user_id=user_id, site=site).first()
 
+    def get_latest_by_user_and_site(self, user_id: str, site: str) -> Optional[Audit]:
+        with Session(engine) as session:
+            return (
+                session.query(Audit)
+                .filter_by(user_id=user_id, site=site)
+                .order_by(Audit.timestamp.desc())
+                .first()
+            )
+
     def list_by_user(self, user_id: str) -> List[Audit]:
         with Session(engine) as session:
             return session.query(Audit).filter_by(user_id=user_id).all()
\ No newline at end of file
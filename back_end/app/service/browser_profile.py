@@ -0,0 +1,105 @@
+import os
+from typing import Iterable, List, Optional
+
+from selenium.webdriver.chrome.options import Options
+
+# Motifs d'URL (syntaxe Network.setBlockedURLs) par type de ressource
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m3u8", "*.mpd"],
+    "stylesheet": ["*.css"]
+}
+
+# Régies publicitaires et lecteurs vidéo : inutiles pour l'analyse RGPD.
+# Les scripts de CMP et de traceurs (analytics, tag managers) ne doivent PAS figurer ici :
+# la détection du bandeau cookie dépend de leur exécution.
+DEFAULT_BLOCKED_URLS = [
+    "*doubleclick.net*", "*googlesyndication.com*", "*adservice.google.*", "*amazon-adsystem.com*",
+    "*criteo.com*", "*criteo.net*", "*taboola.com*", "*outbrain.com*", "*adnxs.com*",
+    "*youtube.com/embed*", "*player.vimeo.com*", "*dailymotion.com/embed*"
+]
+
+
+class BrowserProfile:
+    """
+    Profil Chrome headless pour les sessions du pool.
+    Mode `lean` : images désactivées, blocage par type de ressource et par URL (CDP),
+    stratégie de chargement configurable. Les scripts tiers restent exécutés.
+    """
+
+    def __init__(self, lean: bool = True, blocked_resource_types: Iterable[str] = ("image", "font", "media"),
+                 blocked_urls: Optional[Iterable[str]] = None, page_load_strategy: str = "eager"):
+        self.lean = lean
+        self.blocked_resource_types = list(blocked_resource_types)
+        self.blocked_urls = list(DEFAULT_BLOCKED_URLS if blocked_urls is None else blocked_urls)
+        self.page_load_strategy = page_load_strategy
+
+    @classmethod
+    def from_env(cls) -> "BrowserProfile":
+        def split(value: str) -> List[str]:
+            return [v.strip() for v in value.split(",") if v.strip()]
+
+        extra_urls = split(os.getenv("SELENIUM_BLOCKED_URLS", ""))
+        return cls(
+            lean=os.getenv("SELENIUM_LEAN", "true").lower() == "true",
+            blocked_resource_types=split(os.getenv("SELENIUM_BLOCKED_RESOURCES", "image,font,media")),
+            blocked_urls=DEFAULT_BLOCKED_URLS + extra_urls,
+            page_load_strategy=os.getenv("SELENIUM_PAGE_LOAD_STRATEGY", "eager")
+        )
+
+    def blocked_patterns(self) -> List[str]:
+        patterns = list(self.blocked_urls)
+        for resource_type in self.blocked_resource_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+        return patterns
+
+    def build_options(self) -> Options:
+        options = Options()
+        options.add_argument("--headless")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.page_load_strategy = self.page_load_strategy
+
+        if self.lean:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_argument("--mute-audio")
+            options.add_argument("--disable-extensions")
+            options.add_argument("--disable-background-networking")
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+                "profile.default_content_setting_values.geolocation": 2
+            })
+        return options
+
+    def apply(self, driver) -> bool:
+        """Active le blocage d'URL sur une nouvelle session. Retourne False si CDP n'est pas disponible."""
+        if not self.lean:
+            return True
+        patterns = self.blocked_patterns()
+        if not patterns:
+            return True
+        return (execute_cdp(driver, "Network.enable", {})
+                and execute_cdp(driver, "Network.setBlockedURLs", {"urls": patterns}))
+
+    def __repr__(self):
+        return (f"BrowserProfile(lean={self.lean}, page_load_strategy='{self.page_load_strategy}', "
+                f"blocked_resource_types={self.blocked_resource_types})")
+
+
+def cdp_call(driver, cmd: str, params: dict) -> Optional[dict]:
+    """Exécute une commande Chrome DevTools via une session Remote et retourne sa réponse (None si non supportée)."""
+    try:
+        commands = driver.command_executor._commands
+        if "executeCdpCommand" not in commands:
+            commands["executeCdpCommand"] = ("POST", "/session/$sessionId/goog/cdp/execute")
+        response = driver.execute("executeCdpCommand", {"cmd": cmd, "params": params})
+        return (response or {}).get("value") or {}
+    except Exception:
+        return None
+
+
+def execute_cdp(driver, cmd: str, params: dict) -> bool:
+    """Exécute une commande Chrome DevTools via une session Remote. Retourne False si non supportée."""
+    return cdp_call(driver, cmd, params) is not None
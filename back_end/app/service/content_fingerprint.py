@@ -0,0 +1,75 @@
+import re
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+SIMHASH_BITS = 64
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """Empreinte SimHash 64 bits sur des shingles de mots : textes proches -> empreintes proches."""
+    words = _WORD_RE.findall((text or "").lower())
+    if not words:
+        return 0
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def content_hash(text: str) -> str:
+    """Empreinte exacte (SHA-256) du texte, espaces normalisés : détecte toute modification de contenu."""
+    normalized = " ".join((text or "").split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """
+    Index de quasi-doublons : une empreinte est découpée en (max_distance + 1) bandes ;
+    deux empreintes à distance <= max_distance partagent forcément une bande identique.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self._band_bits = SIMHASH_BITS // self.bands
+        self._buckets: List[Dict[int, List[tuple]]] = [{} for _ in range(self.bands)]
+        self._lock = threading.Lock()
+
+    def _band_keys(self, fingerprint: int):
+        mask = (1 << self._band_bits) - 1
+        for band in range(self.bands):
+            yield band, (fingerprint >> (band * self._band_bits)) & mask
+
+    def find_or_add(self, fingerprint: int, doc_id: str) -> Optional[str]:
+        """Retourne le document original si `fingerprint` est un quasi-doublon, sinon l'indexe."""
+        with self._lock:
+            for band, key in self._band_keys(fingerprint):
+                for other, other_id in self._buckets[band].get(key, []):
+                    if hamming_distance(fingerprint, other) <= self.max_distance:
+                        return other_id
+            for band, key in self._band_keys(fingerprint):
+                self._buckets[band].setdefault(key, []).append((fingerprint, doc_id))
+        return None
+
+    def items(self) -> List[tuple]:
+        """Toutes les empreintes indexées [(empreinte, doc_id)] (sauvegarde / reprise)."""
+        with self._lock:
+            return [entry for bucket in self._buckets[0].values() for entry in bucket]
@@ -1,17 +1,49 @@
+import os
 import requests
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from typing import List, Dict, Any, Optional
-import time
-import json
+import threading
+import weakref
+from app.service.driver_pool import DriverPool, get_driver_pool
+from app.service.http_client import HttpClient, get_http_client
+from app.service.page_readiness import install_probe, wait_for_page_ready
+from app.service.dom_snapshot import (
+    take_dom_snapshot, visible_soup, find_elements_with_text, element_text, extract_forms
+)
+from app.service.static_triage import triage_static_html
+from app.service.keyword_matcher import get_keyword_matcher
+
+# Thèmes RGPD recherchés dans le texte des pages (un seul automate compilé)
+RGPD_SIGNALS = {
+    "cookies": ["cookie", "consent", "traceur"],
+    "confidentialite": ["confidentialité", "privacy", "données personnelles", "protection des données"],
+    "mentions": ["mentions légales", "legal notice"],
+    "formulaires": ["formulaire", "contact", "newsletter", "inscription"],
+    "securite": ["https", "ssl", "sécurité", "chiffrement"],
+    "droits": ["droit d'accès", "effacement", "rectification", "portabilité", "opposition"],
+    "prospection": ["newsletter", "désinscription", "email marketing"]
+}
+
+# Attente maximale de la page en scraping dynamique (secondes) ; la page est analysée dès qu'elle est prête
+DYNAMIC_WAIT_TIME = float(os.getenv("SCRAPER_WAIT_TIME", "5"))
+
+# Mots-clés des liens vers les pages RGPD
+RGPD_LINK_KEYWORDS = {"rgpd": ["cookie", "privacy", "confidentialite", "legal", "rgpd"]}
 
 class ContentScraper:
-    _scrapers: List['ContentScraper'] = []
+    # Registre faible : un scraper disparu n'est pas retenu par la classe
+    _scrapers: 'weakref.WeakSet[ContentScraper]' = weakref.WeakSet()
+    _created_total = 0
+    _registry_lock = threading.Lock()
 
-    def __init__(self, remote_url: str = "http://localhost:4444/wd/hub"):
+    def __init__(self, remote_url: str = "http://localhost:4444/wd/hub", driver_pool: Optional[DriverPool] = None,
+                 http_client: Optional[HttpClient] = None):
         self.remote_url = remote_url
+        # Sessions WebDriver réutilisées (pool partagé par grille par défaut)
+        self.driver_pool = driver_pool or get_driver_pool(remote_url)
+        # Connexions HTTP keep-alive partagées
+        self.http = http_client or get_http_client()
         self.results: Optional[Dict[str, Any]] = None
         self.rgpd_checklist = {
             "cookies": ["cookie", "consent", "traceur"],
@@ -20,99 +52,159 @@ class ContentScraper:
             "formulaires": ["formulaire", "contact", "newsletter"],
             "securite": ["https", "securite", "cryptage", "chiffrement"]
         }
-        ContentScraper._scrapers.append(self)
+        with ContentScraper._registry_lock:
+            ContentScraper._scrapers.add(self)
+            ContentScraper._created_total += 1
+
+    @classmethod
+    def instance_metrics(cls) -> Dict[str, int]:
+        """Instances vivantes et nombre total créé depuis le démarrage du process."""
+        with cls._registry_lock:
+            return {"live": len(cls._scrapers), "total": cls._created_total}
 
     # ------------------------------------------------------------
     # 📄 SCRAPING STATIQUE
     # ------------------------------------------------------------
-    def scrape_static(self, url: str) -> Dict[str, Any]:
-        """Analyse statique : liens RGPD et texte complet des pages RGPD."""
+    def scrape_static(self, url: str, concurrent: bool = True) -> Dict[str, Any]:
+        """
+        Analyse statique : liens RGPD et texte complet des pages RGPD.
+        `concurrent=True` : les pages RGPD sont récupérées en parallèle (une fois chacune).
+        """
+        return self._scrape_static(url, concurrent)[0]
+
+    def _scrape_static(self, url: str, concurrent: bool = True):
+        """Comme scrape_static, retourne aussi le HTML serveur de la page (None si inaccessible)."""
         if not url.startswith("http"):
             url = "https://" + url
 
         result = {"url": url, "liens_rgpd": [], "textes_rgpd": {}}
+        html = None
 
         try:
-            response = requests.get(url, timeout=10)
+            response = self.http.get(url, timeout=10)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
+            html = response.text
+            soup = BeautifulSoup(html, "html.parser")
 
             # Extraction des liens RGPD
             links = [a.get("href") for a in soup.find_all("a", href=True)]
-            rgpd_links = [
-                l for l in links
-                if any(word in l.lower() for word in ["cookie", "privacy", "confidentialite", "legal", "rgpd"])
-            ]
+            link_matcher = get_keyword_matcher(RGPD_LINK_KEYWORDS)
+            rgpd_links = [l for l in links if link_matcher.contains_any(l)]
             result["liens_rgpd"] = rgpd_links
 
             # Extraction du texte des pages RGPD
-            for link in rgpd_links:
-                full_url = link if link.startswith("http") else url.rstrip("/") + "/" + link.lstrip("/")
+            full_urls = [
+                link if link.startswith("http") else url.rstrip("/") + "/" + link.lstrip("/")
+                for link in rgpd_links
+            ]
+            if concurrent:
+                responses = self.http.fetch_many(full_urls, timeout=10)
+            else:
+                responses = {}
+                for full_url in dict.fromkeys(full_urls):
+                    try:
+                        r = self.http.get(full_url, timeout=10)
+                        r.raise_for_status()
+                        responses[full_url] = r
+                    except requests.RequestException:
+                        responses[full_url] = None
+
+            for full_url, r in responses.items():
+                # r vaut None si la page n'a pas pu être récupérée
+                if r is None:
+                    result["textes_rgpd"][full_url] = ""
+                    continue
                 try:
-                    r = requests.get(full_url, timeout=10)
-                    r.raise_for_status()
                     soup_page = BeautifulSoup(r.text, "html.parser")
                     result["textes_rgpd"][full_url] = soup_page.get_text(separator="\n").strip()
-                except Exception:
+                except (UnicodeDecodeError, LookupError) as e:
+                    # Encodage annoncé inconnu ou invalide
+                    print(f"Erreur de décodage pour {full_url} : {e}")
                     result["textes_rgpd"][full_url] = ""
-            return result
+            return result, html
 
         except requests.RequestException as e:
             print(f"Erreur lors de la requête statique : {e}")
-            return result
+            return result, html
+
+    # ------------------------------------------------------------
+    # 🚦 TRIAGE STATIQUE / DYNAMIQUE
+    # ------------------------------------------------------------
+    def scrape_page(self, url: str, force_dynamic: bool = False, snippet_words: int = 200):
+        """
+        Scraping statique, puis Selenium uniquement si le HTML serveur ne suffit pas
+        (SPA, contenu vide, CMP). Retourne (static_data, dynamic_data) ;
+        dynamic_data["triage"] indique la décision et ses raisons.
+        """
+        static_data, html = self._scrape_static(url)
+        triage = triage_static_html(html)
+
+        if force_dynamic or triage["needs_dynamic"]:
+            dynamic_data = self.scrape_dynamic(url, snippet_words=snippet_words)
+            triage["rendered"] = True
+        else:
+            dynamic_data = self.analyze_static_html(static_data["url"], html, snippet_words)
+            triage["rendered"] = False
+
+        dynamic_data["triage"] = triage
+        return static_data, dynamic_data
+
+    def analyze_static_html(self, url: str, html: str, snippet_words: int = 200) -> Dict[str, Any]:
+        """Produit la même sortie que scrape_dynamic à partir du HTML serveur, sans navigateur."""
+        soup = visible_soup(html)
+        mains = [element_text(m) for m in soup.find_all("main")]
+        mains = [t for t in mains if t.strip()]
+        if mains:
+            text = "\n".join(mains)
+        else:
+            text = element_text(soup.body or soup)
+        forms = extract_forms(soup, url)
+        return self.analyze_dom(self._empty_results(url), html, text, forms, snippet_words, soup=soup)
 
     # ------------------------------------------------------------
     # 🧠 DÉTECTION DE SIGNAUX RGPD
     # ------------------------------------------------------------
     def detect_rgpd_signals(self, text: str) -> Dict[str, bool]:
         """Détection rapide des thèmes RGPD dans le texte général de la page"""
-        checks = {
-            "cookies": ["cookie", "consent", "traceur"],
-            "confidentialite": ["confidentialité", "privacy", "données personnelles", "protection des données"],
-            "mentions": ["mentions légales", "legal notice"],
-            "formulaires": ["formulaire", "contact", "newsletter", "inscription"],
-            "securite": ["https", "ssl", "sécurité", "chiffrement"],
-            "droits": ["droit d'accès", "effacement", "rectification", "portabilité", "opposition"],
-            "prospection": ["newsletter", "désinscription", "email marketing"]
-        }
-        detected = {}
-        lower_text = text.lower()
-        for theme, keywords in checks.items():
-            detected[theme] = any(k in lower_text for k in keywords)
-        return detected
+        return get_keyword_matcher(RGPD_SIGNALS).detect(text)
+
+    def detect_rgpd_evidence(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Occurrences de chaque thème RGPD avec leurs positions (start/end) dans le texte, en un passage."""
+        return get_keyword_matcher(RGPD_SIGNALS).scan(text)
 
     # ------------------------------------------------------------
     # ⚙️ SCRAPING DYNAMIQUE COMPLET AVEC SNIPPETS
     # ------------------------------------------------------------
-    def scrape_dynamic(self, url: str, wait_time: int = 5, implicit_wait: int = 2, snippet_words: int = 200) -> Dict[str, Any]:
-        """Scraping dynamique RGPD complet + création de snippets pour NLP"""
+    def scrape_dynamic(self, url: str, wait_time: Optional[float] = None, implicit_wait: int = 2, snippet_words: int = 200,
+                       snapshot: bool = True) -> Dict[str, Any]:
+        """
+        Scraping dynamique RGPD complet + création de snippets pour NLP.
+        `wait_time` est le délai maximal d'attente (DYNAMIC_WAIT_TIME par défaut) : la page est analysée
+        dès qu'elle est prête ; results["page_readiness"]["timed_out"] indique si le délai a été atteint.
+        `snapshot=True` : un seul execute_script puis analyse locale du DOM (analyze_dom),
+        sinon requêtes XPath élément par élément sur la grille.
+        """
         if not url.startswith("http"):
             url = "https://" + url
 
-        results = {
-            "url": url,
-            "signals_detected": {},
-            "html_text_snippet": "",
-            "snippets_nlp": {},  # dict indexé pour NLP
-            "bandeau_cookie": {"present": False, "texts": []},
-            "privacy_sections": {"present": False, "texts": []},
-            "mentions_legales": {"present": False, "texts": []},
-            "formulaires_detectes": 0,
-            "formulaires_info": [],
-            "security_info": {"https": False, "mentions": []}
-        }
+        results = self._empty_results(url)
+        wait_time = DYNAMIC_WAIT_TIME if wait_time is None else wait_time
 
         driver = None
+        failed = False
         try:
-            options = Options()
-            options.add_argument("--headless")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-
-            driver = webdriver.Remote(command_executor=self.remote_url, options=options)
+            driver = self.driver_pool.checkout()
             driver.implicitly_wait(implicit_wait)
+            install_probe(driver)
             driver.get(url)
-            time.sleep(wait_time)
+            readiness = wait_for_page_ready(driver, max_wait=wait_time)
+            results["page_readiness"] = {**readiness, "timed_out": not readiness["ready"]}
+            # Origines à effacer au retour dans le pool (URL demandée et URL finale après redirection)
+            self.driver_pool.track_origin(driver, url, driver.current_url)
+
+            if snapshot:
+                snap = take_dom_snapshot(driver)
+                return self.analyze_dom(results, snap["html"], snap["text"], snap["forms"], snippet_words)
 
             # ---- Récupération du texte principal ----
             main_content = driver.find_elements(By.TAG_NAME, "main")
@@ -122,22 +214,7 @@ class ContentScraper:
                 body = driver.find_element(By.TAG_NAME, "body")
                 full_text = body.text or ""
 
-            # Nettoyage simple pour NLP
-            full_text = "\n".join([line.strip() for line in full_text.splitlines() if line.strip()])
-            results["html_text_snippet"] = full_text
-
-            # ---- Création des snippets NLP ----
-            paragraphs = [p.strip() for p in full_text.split("\n") if p.strip()]
-            snippets = []
-            for p in paragraphs:
-                words = p.split()
-                for i in range(0, len(words), snippet_words):
-                    snippets.append(" ".join(words[i:i + snippet_words]))
-            results["snippets_nlp"] = {i: s for i, s in enumerate(snippets)}
-
-            # ---- Détection des signaux RGPD ----
-            rgpd_signals = self.detect_rgpd_signals(full_text)
-            results["signals_detected"] = rgpd_signals
+            rgpd_signals = self._analyze_text(results, full_text, snippet_words)
             lower_html = driver.page_source.lower()
 
             # ---- Bandeau cookie ----
@@ -208,15 +285,126 @@ class ContentScraper:
                 if "sécurité" in lower_html or "ssl" in lower_html:
                     results["security_info"]["mentions"].append("Mention de sécurité trouvée")
 
-            driver.quit()
             return results
 
         except Exception as e:
             print(f"Erreur scraping dynamique : {e}")
-            if driver:
-                driver.quit()
+            failed = True
             return results
 
+        finally:
+            # Retour au pool : reset cookies/storage, recyclage si session usée ou plantée
+            if driver:
+                self.driver_pool.checkin(driver, failed=failed)
+
+    @staticmethod
+    def _empty_results(url: str) -> Dict[str, Any]:
+        """Structure de sortie commune à scrape_dynamic et analyze_static_html."""
+        return {
+            "url": url,
+            "signals_detected": {},
+            "signals_evidence": {},
+            "html_text_snippet": "",
+            "snippets_nlp": {},  # dict indexé pour NLP
+            "bandeau_cookie": {"present": False, "texts": []},
+            "privacy_sections": {"present": False, "texts": []},
+            "mentions_legales": {"present": False, "texts": []},
+            "formulaires_detectes": 0,
+            "formulaires_info": [],
+            "security_info": {"https": False, "mentions": []}
+        }
+
+    # ------------------------------------------------------------
+    # 📝 TEXTE, SNIPPETS NLP ET SIGNAUX
+    # ------------------------------------------------------------
+    def _analyze_text(self, results: Dict[str, Any], full_text: str, snippet_words: int) -> Dict[str, bool]:
+        """Remplit html_text_snippet, snippets_nlp, signals_detected et signals_evidence ; retourne les signaux."""
+        # Nettoyage simple pour NLP
+        full_text = "\n".join([line.strip() for line in full_text.splitlines() if line.strip()])
+        results["html_text_snippet"] = full_text
+
+        # ---- Création des snippets NLP ----
+        paragraphs = [p.strip() for p in full_text.split("\n") if p.strip()]
+        snippets = []
+        for p in paragraphs:
+            words = p.split()
+            for i in range(0, len(words), snippet_words):
+                snippets.append(" ".join(words[i:i + snippet_words]))
+        results["snippets_nlp"] = {i: s for i, s in enumerate(snippets)}
+
+        # ---- Détection des signaux RGPD (un seul passage, positions dans html_text_snippet) ----
+        evidence = self.detect_rgpd_evidence(full_text)
+        rgpd_signals = {theme: theme in evidence for theme in RGPD_SIGNALS}
+        results["signals_detected"] = rgpd_signals
+        results["signals_evidence"] = evidence
+        return rgpd_signals
+
+    # ------------------------------------------------------------
+    # 🧩 ANALYSE LOCALE D'UN SNAPSHOT DOM
+    # ------------------------------------------------------------
+    def analyze_dom(self, results: Dict[str, Any], html: str, text: str, forms: List[Dict[str, Any]],
+                    snippet_words: int = 200, soup: Optional[BeautifulSoup] = None) -> Dict[str, Any]:
+        """Même analyse que le mode XPath, calculée en local à partir du DOM sérialisé."""
+        rgpd_signals = self._analyze_text(results, text, snippet_words)
+        soup = soup or visible_soup(html)
+        lower_html = html.lower()
+
+        # ---- Bandeau cookie ----
+        if rgpd_signals.get("cookies"):
+            texts = find_elements_with_text(soup, ["cookie", "consent"])
+            results["bandeau_cookie"]["present"] = len(texts) > 0
+            results["bandeau_cookie"]["texts"] = [t for t in texts if t]
+
+        # ---- Sections privacy ----
+        if rgpd_signals.get("confidentialite"):
+            for t in find_elements_with_text(soup, ["privacy", "confidentialit", "données personnelles"]):
+                if t and t not in results["privacy_sections"]["texts"]:
+                    results["privacy_sections"]["texts"].append(t)
+            results["privacy_sections"]["present"] = len(results["privacy_sections"]["texts"]) > 0
+
+        # ---- Mentions légales ----
+        if rgpd_signals.get("mentions"):
+            for t in find_elements_with_text(soup, ["mentions légales", "legal notice"]):
+                if t and t not in results["mentions_legales"]["texts"]:
+                    results["mentions_legales"]["texts"].append(t)
+            results["mentions_legales"]["present"] = len(results["mentions_legales"]["texts"]) > 0
+
+        # ---- Formulaires ----
+        if rgpd_signals.get("formulaires"):
+            results["formulaires_detectes"] = len(forms)
+            for f in forms:
+                info = {
+                    "action": f.get("action") or "",
+                    "method": (f.get("method") or "").lower(),
+                    "inputs": [],
+                    "checkboxes_count": 0,
+                    "all_unchecked": True
+                }
+                for i in f.get("inputs", []):
+                    itype = (i.get("type") or "").lower()
+                    checked = False
+                    if itype == "checkbox":
+                        info["checkboxes_count"] += 1
+                        checked = bool(i.get("checked"))
+                        if checked:
+                            info["all_unchecked"] = False
+                    info["inputs"].append({
+                        "tag": i.get("tag", ""),
+                        "type": itype,
+                        "name": i.get("name", ""),
+                        "placeholder": i.get("placeholder", ""),
+                        "checked": checked
+                    })
+                results["formulaires_info"].append(info)
+
+        # ---- Sécurité ----
+        if rgpd_signals.get("securite"):
+            results["security_info"]["https"] = results["url"].startswith("https")
+            if "sécurité" in lower_html or "ssl" in lower_html:
+                results["security_info"]["mentions"].append("Mention de sécurité trouvée")
+
+        return results
+
     def __repr__(self):
         return f"ContentScraper(remote_url='{self.remote_url}')"
 
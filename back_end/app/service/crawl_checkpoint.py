@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.service.data_paths import data_path
+
+DEFAULT_CHECKPOINT_PATH = data_path("crawl_checkpoints.sqlite")
+
+# Dictionnaires à clés entières des résultats de scraping (clés converties en chaînes par JSON)
+INT_KEYED_FIELDS = ("snippets_nlp",)
+
+
+def restore_int_keys(value: Any) -> Any:
+    """Rétablit les clés entières des champs INT_KEYED_FIELDS : un résultat rechargé est identique à l'original."""
+    if isinstance(value, list):
+        return [restore_int_keys(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    restored = {}
+    for key, item in value.items():
+        if key in INT_KEYED_FIELDS and isinstance(item, dict):
+            item = {int(k) if isinstance(k, str) and k.lstrip("-").isdigit() else k: v for k, v in item.items()}
+        restored[key] = restore_int_keys(item)
+    return restored
+
+
+class CrawlCheckpoint:
+    """
+    Points de reprise des crawls (SQLite local) :
+    - `state` : frontière, pages visitées, doublons, catégories couvertes, certificats...
+      (réécrit à chaque checkpoint, un seul état par crawl)
+    - `results` : résultats de scraping partiels, ajoutés au fil de l'eau
+    Un crawl est identifié par son `crawl_id` (par défaut l'URL de départ canonique).
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_state (
+                crawl_id TEXT PRIMARY KEY,
+                state TEXT,
+                updated_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_results (
+                crawl_id TEXT,
+                url TEXT,
+                result TEXT,
+                saved_at REAL,
+                PRIMARY KEY (crawl_id, url)
+            )
+        """)
+        self._conn.commit()
+
+    # ------------------------------------------------------------
+    # 💾 ÉCRITURE
+    # ------------------------------------------------------------
+    def save_state(self, crawl_id: str, state: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawl_state VALUES (?, ?, ?)",
+                (crawl_id, json.dumps(state, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def save_result(self, crawl_id: str, url: str, result: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawl_results VALUES (?, ?, ?, ?)",
+                (crawl_id, url, json.dumps(result, ensure_ascii=False, default=str), time.time())
+            )
+            self._conn.commit()
+
+    def clear(self, crawl_id: str):
+        """Supprime l'état et les résultats d'un crawl (audit terminé ou à relancer de zéro)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM crawl_state WHERE crawl_id = ?", (crawl_id,))
+            self._conn.execute("DELETE FROM crawl_results WHERE crawl_id = ?", (crawl_id,))
+            self._conn.commit()
+
+    # ------------------------------------------------------------
+    # 🔎 LECTURE
+    # ------------------------------------------------------------
+    def load_state(self, crawl_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM crawl_state WHERE crawl_id = ?", (crawl_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_results(self, crawl_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM crawl_results WHERE crawl_id = ? ORDER BY saved_at", (crawl_id,)
+            ).fetchall()
+        return [restore_int_keys(json.loads(row[0])) for row in rows]
+
+    def __repr__(self):
+        return f"CrawlCheckpoint(path='{self.path}')"
@@ -0,0 +1,121 @@
+import time
+import heapq
+import itertools
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+
+class CrawlFrontier:
+    """
+    Frontière de crawl thread-safe à priorité : les URLs de plus forte priorité sortent d'abord,
+    à priorité égale l'ordre reste celui d'un parcours en largeur (profondeur puis ordre d'ajout).
+    Politesse par hôte : deux requêtes vers le même hôte démarrent à au moins `delay` secondes
+    d'intervalle, les autres hôtes restent servis pendant ce temps.
+    `key` définit quand deux URLs sont considérées identiques (ex. url_key).
+    """
+
+    def __init__(self, delay: float = 1.0, key: Optional[Callable[[str], str]] = None):
+        self.delay = delay
+        self._key = key or (lambda url: url)
+        self._queues: Dict[str, List[Tuple[float, int, int, str]]] = {}  # une file par hôte
+        self._seen: Set[str] = set()
+        self._next_allowed: Dict[str, float] = {}
+        self._counter = itertools.count()
+        self._pending = 0
+        self._in_flight = 0
+        self._active: Dict[str, Tuple[float, int]] = {}  # URL en cours -> (priorité, profondeur)
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def push(self, url: str, depth: int, priority: float = 0.0) -> bool:
+        """Ajoute une URL jamais vue. Retourne False si elle est déjà connue ou la frontière fermée."""
+        with self._cond:
+            seen_key = self._key(url)
+            if self._closed or seen_key in self._seen:
+                return False
+            self._seen.add(seen_key)
+            host = urlparse(url).netloc
+            heapq.heappush(self._queues.setdefault(host, []), (-priority, depth, next(self._counter), url))
+            self._pending += 1
+            self._cond.notify()
+            return True
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """
+        Meilleure URL parmi les hôtes pouvant être sollicités (bloque sinon).
+        Retourne None quand le crawl est terminé : file vide sans travail en cours, ou frontière fermée.
+        Chaque URL retournée doit être suivie d'un appel à task_done().
+        """
+        with self._cond:
+            while True:
+                if self._closed or (not self._pending and self._in_flight == 0):
+                    self._cond.notify_all()
+                    return None
+
+                now = time.monotonic()
+                best_host = None
+                earliest = None
+                for host, queue in self._queues.items():
+                    if not queue:
+                        continue
+                    ready_at = self._next_allowed.get(host, 0)
+                    if ready_at > now:
+                        earliest = ready_at if earliest is None else min(earliest, ready_at)
+                    elif best_host is None or queue[0] < self._queues[best_host][0]:
+                        best_host = host
+
+                if best_host is not None:
+                    neg_priority, depth, _, url = heapq.heappop(self._queues[best_host])
+                    self._next_allowed[best_host] = now + self.delay
+                    self._pending -= 1
+                    self._in_flight += 1
+                    self._active[url] = (-neg_priority, depth)
+                    return url, depth
+
+                self._cond.wait(None if earliest is None else earliest - now)
+
+    def task_done(self, url: Optional[str] = None):
+        """
+        Fin du traitement d'une URL retournée par pop(). Sans `url`, l'URL n'est pas considérée
+        comme traitée : elle reste dans snapshot() pour être reprise.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            self._active.pop(url, None)
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, list]:
+        """
+        État sérialisable de la frontière (checkpoint) : URLs en attente et en cours de traitement
+        [(url, profondeur, priorité)] et clés déjà vues. Les URLs en cours seront retraitées à la reprise.
+        """
+        with self._cond:
+            entries = [(url, depth, -neg_priority)
+                       for queue in self._queues.values() for neg_priority, depth, _, url in queue]
+            entries += [(url, depth, priority) for url, (priority, depth) in self._active.items()]
+            return {"entries": entries, "seen": sorted(self._seen)}
+
+    def restore(self, state: Dict[str, list]):
+        """Recharge un état produit par snapshot() (reprise d'un crawl interrompu)."""
+        with self._cond:
+            self._seen.update(state.get("seen", []))
+            for url, depth, priority in state.get("entries", []):
+                self._seen.add(self._key(url))
+                host = urlparse(url).netloc
+                heapq.heappush(self._queues.setdefault(host, []), (-priority, depth, next(self._counter), url))
+                self._pending += 1
+            self._cond.notify_all()
+
+    def close(self):
+        """Arrête la distribution d'URLs (budget atteint)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return self._pending
+
+    def __repr__(self):
+        return f"CrawlFrontier(pending={len(self)}, seen={len(self._seen)})"
@@ -0,0 +1,12 @@
+import os
+
+# Dossier de données de l'application (back_end/data), indépendant du répertoire courant
+APP_DATA_DIR = os.getenv(
+    "APP_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
+)
+
+
+def data_path(name: str) -> str:
+    """Chemin absolu d'un fichier (cache, checkpoint, modèle exporté) dans APP_DATA_DIR."""
+    return os.path.join(APP_DATA_DIR, name)
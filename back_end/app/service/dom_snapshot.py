@@ -0,0 +1,129 @@
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, NavigableString, Comment
+
+HIDDEN_ATTR = "data-psci-hidden"
+
+# Un seul execute_script : DOM sérialisé + texte rendu + état réel des formulaires
+SNAPSHOT_JS = """
+var HIDDEN = '%s';
+if (document.body) {
+  var walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT, {
+    acceptNode: function (el) {
+      if (getComputedStyle(el).display === 'none') {
+        el.setAttribute(HIDDEN, '1');
+        return NodeFilter.FILTER_REJECT;
+      }
+      return NodeFilter.FILTER_ACCEPT;
+    }
+  });
+  while (walker.nextNode()) {}
+}
+
+function prop(el, name) {
+  var v = el[name];
+  return typeof v === 'string' ? v : (el.getAttribute(name) || '');
+}
+
+var mains = Array.prototype.slice.call(document.getElementsByTagName('main'))
+  .map(function (m) { return m.innerText || ''; })
+  .filter(function (t) { return t.trim(); });
+var text = mains.length ? mains.join('\\n') : (document.body ? document.body.innerText : '');
+
+var forms = Array.prototype.map.call(document.forms, function (f) {
+  return {
+    action: prop(f, 'action'),
+    method: prop(f, 'method'),
+    inputs: Array.prototype.map.call(f.querySelectorAll('input, textarea, select'), function (i) {
+      var tag = i.tagName.toLowerCase();
+      return {
+        tag: tag,
+        type: tag === 'input' ? (i.type || '') : tag,
+        name: i.getAttribute('name') || '',
+        placeholder: i.getAttribute('placeholder') || '',
+        checked: !!i.checked
+      };
+    })
+  };
+});
+
+return { html: document.documentElement.outerHTML, text: text, forms: forms };
+""" % HIDDEN_ATTR
+
+_SKIPPED_TAGS = ["script", "style", "noscript", "template", "head"]
+
+
+def take_dom_snapshot(driver) -> Dict[str, Any]:
+    """Capture le DOM rendu et l'état des formulaires en un seul aller-retour WebDriver."""
+    snapshot = driver.execute_script(SNAPSHOT_JS) or {}
+    return {
+        "html": snapshot.get("html", ""),
+        "text": snapshot.get("text", ""),
+        "forms": snapshot.get("forms", [])
+    }
+
+
+def visible_soup(html: str) -> BeautifulSoup:
+    """Parse le DOM et retire les éléments non rendus (display:none, scripts, styles)."""
+    soup = BeautifulSoup(html or "", "html.parser")
+    for el in soup.find_all(attrs={HIDDEN_ATTR: True}):
+        el.decompose()
+    # HTML serveur : pas de styles calculés, seulement `hidden` et style inline
+    for el in soup.find_all(lambda tag: tag.has_attr("hidden") or _inline_hidden(tag)):
+        if not el.decomposed:
+            el.decompose()
+    for el in soup.find_all(_SKIPPED_TAGS):
+        el.decompose()
+    return soup
+
+
+def _inline_hidden(tag) -> bool:
+    style = (tag.get("style") or "").replace(" ", "").lower()
+    return "display:none" in style
+
+
+def element_text(el) -> str:
+    """Équivalent local de WebElement.text : lignes non vides, espaces normalisés."""
+    lines = [" ".join(line.split()) for line in el.get_text(separator="\n").splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def find_elements_with_text(soup: BeautifulSoup, keywords: List[str]) -> List[str]:
+    """
+    Textes des éléments dont un nœud texte direct contient un des mots-clés
+    (même sélection que `//*[contains(translate(text(), ...), kw)]`).
+    """
+    keywords = [k.lower() for k in keywords]
+    texts = []
+    for el in soup.find_all(True):
+        own_text = " ".join(
+            str(c) for c in el.children
+            if isinstance(c, NavigableString) and not isinstance(c, Comment)
+        ).lower()
+        if own_text and any(k in own_text for k in keywords):
+            texts.append(element_text(el))
+    return texts
+
+
+def extract_forms(soup: BeautifulSoup, base_url: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Formulaires depuis du HTML serveur (même format que l'état capturé par SNAPSHOT_JS)."""
+    forms = []
+    for f in soup.find_all("form"):
+        inputs = []
+        for i in f.find_all(["input", "textarea", "select"]):
+            tag = i.name.lower()
+            inputs.append({
+                "tag": tag,
+                "type": (i.get("type") or "text").lower() if tag == "input" else tag,
+                "name": i.get("name") or "",
+                "placeholder": i.get("placeholder") or "",
+                "checked": i.has_attr("checked")
+            })
+        action = f.get("action") or ""
+        forms.append({
+            "action": urljoin(base_url, action) if base_url else action,
+            "method": f.get("method") or "get",
+            "inputs": inputs
+        })
+    return forms
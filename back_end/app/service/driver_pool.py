@@ -0,0 +1,275 @@
+import os
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from app.service.browser_profile import BrowserProfile, cdp_call, execute_cdp
+
+DEFAULT_REMOTE_URL = "http://localhost:4444/wd/hub"
+
+
+def url_origin(url: str) -> Optional[str]:
+    """Origine (schéma://hôte[:port]) d'une URL http(s), None sinon (about:blank, data:...)."""
+    parts = urlsplit(url or "")
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc.lower()}"
+
+
+class _PooledDriver:
+    """Session WebDriver gérée par le pool (compteur de pages, date de création, origines visitées)."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+        self.origins: Set[str] = set()
+
+
+class DriverPool:
+    """
+    Pool borné de sessions WebDriver réutilisables (checkout / checkin).
+    - au plus `max_size` navigateurs ouverts en même temps sur la grille
+    - health check avant de ressortir une session inactive
+    - recyclage après `max_pages` pages ou en cas de crash
+    - cookies / storage remis à zéro à chaque retour dans le pool
+    """
+
+    def __init__(self, remote_url: str = DEFAULT_REMOTE_URL, max_size: int = 2,
+                 max_pages: int = 50, checkout_timeout: float = 120,
+                 profile: Optional[BrowserProfile] = None):
+        self.remote_url = remote_url
+        self.profile = profile or BrowserProfile(lean=False, page_load_strategy="normal")
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+
+        self._idle: List[_PooledDriver] = []
+        self._in_use: Dict[int, _PooledDriver] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    # ------------------------------------------------------------
+    # 🔧 CRÉATION / DESTRUCTION DES SESSIONS
+    # ------------------------------------------------------------
+    def build_options(self) -> Options:
+        return self.profile.build_options()
+
+    def _create(self) -> _PooledDriver:
+        driver = webdriver.Remote(command_executor=self.remote_url, options=self.build_options())
+        self.profile.apply(driver)
+        return _PooledDriver(driver)
+
+    @staticmethod
+    def _quit(entry: _PooledDriver):
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        """Vérifie que la session répond encore (un aller-retour léger)."""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def frame_origins(driver) -> Set[str]:
+        """Origines de la page courante et de toutes ses iframes (arbre des frames CDP)."""
+        origins = set()
+        tree = cdp_call(driver, "Page.getFrameTree", {})
+        stack = [tree.get("frameTree")] if tree else []
+        while stack:
+            node = stack.pop()
+            if not node:
+                continue
+            origin = url_origin(node.get("frame", {}).get("url", ""))
+            if origin:
+                origins.add(origin)
+            stack.extend(node.get("childFrames", []))
+        return origins
+
+    @classmethod
+    def reset_state(cls, driver, origins: Iterable[str] = ()):
+        """
+        Efface cookies et stockages (localStorage, sessionStorage, IndexedDB, cache storage,
+        service workers...) de toutes les origines visitées, iframes tierces comprises,
+        avant la page suivante. Sans CDP : effacement JS limité à l'origine courante.
+        """
+        origins = set(origins) | cls.frame_origins(driver)
+        cleared = execute_cdp(driver, "Network.clearBrowserCookies", {})
+        for origin in origins:
+            cleared = execute_cdp(
+                driver, "Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"}
+            ) and cleared
+
+        if not cleared:
+            try:
+                driver.execute_script(
+                    "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+                )
+            except Exception:
+                pass
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    # ------------------------------------------------------------
+    # 🔁 CHECKOUT / CHECKIN
+    # ------------------------------------------------------------
+    def checkout(self, timeout: Optional[float] = None):
+        """Retourne une session prête à l'emploi (attend si le pool est plein)."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("DriverPool fermé")
+
+                    if self._idle:
+                        # Session réservée pendant la vérification de santé, faite hors verrou
+                        entry = self._idle.pop()
+                        self._in_use[id(entry.driver)] = entry
+                        break
+
+                    if len(self._in_use) < self.max_size:
+                        # Réserve la place avant de créer la session hors verrou
+                        entry = None
+                        placeholder = object()
+                        self._in_use[id(placeholder)] = None
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Aucune session WebDriver disponible dans le pool")
+                    self._cond.wait(remaining)
+
+            if entry is None:
+                break
+            if self.is_healthy(entry.driver):
+                return entry.driver
+            with self._cond:
+                self._in_use.pop(id(entry.driver), None)
+                self._cond.notify()
+            self._quit(entry)
+
+        try:
+            entry = self._create()
+        except Exception:
+            with self._cond:
+                self._in_use.pop(id(placeholder), None)
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._in_use.pop(id(placeholder), None)
+            self._in_use[id(entry.driver)] = entry
+        return entry.driver
+
+    def track_origin(self, driver, *urls: str):
+        """Enregistre les origines chargées par une session (effacées au checkin)."""
+        origins = {url_origin(url) for url in urls} - {None}
+        with self._cond:
+            entry = self._in_use.get(id(driver))
+            if entry is not None:
+                entry.origins.update(origins)
+
+    def checkin(self, driver, failed: bool = False):
+        """Remet la session dans le pool, ou la recycle si usée / plantée."""
+        with self._cond:
+            entry = self._in_use.pop(id(driver), None)
+        if entry is None:
+            return
+
+        entry.pages += 1
+        recycle = self._closed or entry.pages >= self.max_pages
+        if failed and not self.is_healthy(driver):
+            recycle = True
+
+        if not recycle:
+            try:
+                self.reset_state(driver, entry.origins)
+            except Exception:
+                recycle = True
+        entry.origins.clear()
+
+        with self._cond:
+            if recycle or self._closed:
+                self._quit(entry)
+            else:
+                self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        """Context manager : `with pool.driver() as driver: ...`"""
+        driver = self.checkout(timeout)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.checkin(driver, failed=failed)
+
+    def close(self):
+        """Ferme toutes les sessions inactives ; les sessions en cours seront fermées au checkin."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "max_size": self.max_size
+            }
+
+    def __repr__(self):
+        return f"DriverPool(remote_url='{self.remote_url}', max_size={self.max_size})"
+
+
+# ------------------------------------------------------------
+# 🌐 POOLS PARTAGÉS PAR GRILLE SELENIUM
+# ------------------------------------------------------------
+_pools: Dict[str, DriverPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_driver_pool(remote_url: str = DEFAULT_REMOTE_URL) -> DriverPool:
+    """Pool partagé par URL de grille : tous les scrapers du process réutilisent les mêmes navigateurs."""
+    with _pools_lock:
+        pool = _pools.get(remote_url)
+        if pool is None or pool._closed:
+            pool = DriverPool(
+                remote_url=remote_url,
+                max_size=int(os.getenv("SELENIUM_POOL_SIZE", "2")),
+                max_pages=int(os.getenv("SELENIUM_MAX_PAGES_PER_DRIVER", "50")),
+                profile=BrowserProfile.from_env()
+            )
+            _pools[remote_url] = pool
+        return pool
+
+
+@atexit.register
+def _close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
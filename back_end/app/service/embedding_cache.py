@@ -0,0 +1,182 @@
+import os
+import time
+import atexit
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from app.service.data_paths import data_path
+from app.service.sqlite_lru import SqliteLru
+
+DEFAULT_CACHE_PATH = data_path("embedding_cache.sqlite")
+
+
+def embedding_key(model_id: str, text: str) -> str:
+    """Clé de contenu : hash du texte normalisé (espaces) et de l'identifiant du modèle."""
+    normalized = " ".join((text or "").split())
+    return hashlib.sha256(f"{model_id}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Cache des embeddings adressé par contenu, sur deux niveaux :
+    - mémoire : LRU de `memory_size` vecteurs, propre au processus
+    - disque : SQLite (WAL), partagé par tous les workers qui pointent sur le même fichier,
+      ouvert au premier accès disque ; éviction LRU dès que les vecteurs dépassent `max_bytes`
+      (dates d'accès écrites par lot, au plus toutes les `access_flush_interval` secondes)
+    Les textes récurrents (bandeaux cookies, mentions de pied de page, gabarits CMS)
+    ne repassent plus par le modèle d'un audit à l'autre.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, memory_size: int = 4096,
+                 max_bytes: int = 256 * 1024 * 1024, access_flush_interval: float = 30):
+        self.path = path
+        self.memory_size = memory_size
+        self.max_bytes = max_bytes
+        self.access_flush_interval = access_flush_interval
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lru = SqliteLru("embeddings", "key", "LENGTH(vector)", max_bytes, access_flush_interval)
+        self.hits = {"memory": 0, "disk": 0, "miss": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connexion SQLite ouverte au premier usage (verrou déjà pris)."""
+        if self._conn is not None:
+            return self._conn
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                dim INTEGER,
+                vector BLOB,
+                created_at REAL,
+                accessed_at REAL
+            )
+        """)
+        # Fichiers créés avant l'éviction LRU : colonne accessed_at ajoutée
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}
+        if "accessed_at" not in columns:
+            conn.execute("ALTER TABLE embeddings ADD COLUMN accessed_at REAL")
+            conn.execute("UPDATE embeddings SET accessed_at = created_at")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings(accessed_at)")
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    # ------------------------------------------------------------
+    # 🔎 LECTURE
+    # ------------------------------------------------------------
+    def get_many(self, model_id: str, texts: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Vecteurs déjà connus pour ces textes {texte: vecteur} (les absents sont omis)."""
+        keys = {embedding_key(model_id, text): text for text in texts}
+        found: Dict[str, np.ndarray] = {}
+        missing = []
+
+        now = time.time()
+        with self._lock:
+            for key, text in keys.items():
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[text] = vector
+                    self._lru.touch(key, now)
+                    self.hits["memory"] += 1
+                else:
+                    missing.append(key)
+
+            # SQLite limite le nombre de paramètres par requête
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = self._connection().execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(key, vector)
+                    found[keys[key]] = vector
+                    self._lru.touch(key, now)
+                    self.hits["disk"] += 1
+            self.hits["miss"] += len(keys) - len(found)
+
+            if self._lru.flush_due():
+                self._lru.flush(self._connection())
+                self._conn.commit()
+        return found
+
+    # ------------------------------------------------------------
+    # 💾 ÉCRITURE
+    # ------------------------------------------------------------
+    def put_many(self, model_id: str, vectors: Dict[str, np.ndarray]):
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, vector in vectors.items():
+                key = embedding_key(model_id, text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, model_id, int(vector.shape[-1]), vector.tobytes(), now, now))
+            conn = self._connection()
+            conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._lru.evict(conn)
+            conn.commit()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Ajoute au niveau mémoire (verrou déjà pris)."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def flush(self):
+        """Force l'écriture des dates d'accès en attente."""
+        with self._lock:
+            if self._conn is not None:
+                self._lru.flush(self._conn)
+                self._conn.commit()
+
+    def clear(self, model_id: Optional[str] = None):
+        with self._lock:
+            self._memory.clear()
+            self._lru.forget()
+            conn = self._connection()
+            if model_id:
+                conn.execute("DELETE FROM embeddings WHERE model = ?", (model_id,))
+            else:
+                conn.execute("DELETE FROM embeddings")
+            conn.commit()
+
+    def __repr__(self):
+        return (f"EmbeddingCache(path='{self.path}', memory_size={self.memory_size}, "
+                f"max_bytes={self.max_bytes}, hits={self.hits})")
+
+
+# ------------------------------------------------------------
+# 🌐 CACHE PARTAGÉ DU PROCESSUS
+# ------------------------------------------------------------
+_shared_cache: Optional[EmbeddingCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Cache partagé (None si EMBEDDING_CACHE_ENABLED=false) ; le fichier SQLite n'est ouvert qu'au premier accès disque."""
+    global _shared_cache
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = EmbeddingCache(
+                path=os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH),
+                memory_size=int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "4096")),
+                max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_MB", "256")) * 1024 * 1024
+            )
+            atexit.register(_shared_cache.flush)
+        return _shared_cache
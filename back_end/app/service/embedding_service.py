@@ -0,0 +1,189 @@
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.service.model_loader import lazy_resource
+from app.service.embedding_cache import EmbeddingCache, get_embedding_cache
+from app.service import onnx_backend
+from app.service.text_segmenter import split_sentences, token_windows
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+DEFAULT_WINDOW_OVERLAP = int(os.getenv("EMBEDDING_WINDOW_OVERLAP", "32"))  # Tokens repris d'une fenêtre à l'autre
+
+# Dimension des modèles connus : une entrée vide ne force pas le chargement du modèle
+KNOWN_DIMENSIONS = {DEFAULT_EMBEDDING_MODEL: 384}
+
+
+def canonical_model_name(model_name: str) -> str:
+    """'all-MiniLM-L6-v2' et 'sentence-transformers/all-MiniLM-L6-v2' désignent le même modèle."""
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+class EmbeddingService:
+    """
+    Service d'embeddings unique du processus (Facade, NLPPreprocessor, SemanticMatcher) :
+    - une seule copie du modèle en mémoire, chargée au premier encode
+    - même pooling (celui du modèle SentenceTransformer) et vecteurs normalisés L2 partout,
+      la similarité cosinus se réduit à un produit scalaire
+    """
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, batch_size: int = DEFAULT_BATCH_SIZE,
+                 cache: Optional[EmbeddingCache] = None):
+        self.model_name = canonical_model_name(model_name)
+        self.batch_size = batch_size
+        self.cache = cache  # Cache des vecteurs par contenu (None = toujours recalculer)
+        self.backend: Optional[str] = None  # "torch" ou "onnx-int8", fixé par le chargement du modèle
+        self._model = lazy_resource(f"embedder:{self.model_name}", self._load_model)
+
+    def _load_model(self):
+        def load_onnx():
+            encoder = onnx_backend.OnnxSentenceEncoder(self.model_name)
+            self.backend = "onnx-int8"
+            return encoder
+
+        def load_torch():
+            from sentence_transformers import SentenceTransformer
+            self.backend = "torch"
+            return SentenceTransformer(self.model_name)
+
+        return onnx_backend.load_with_fallback(self.model_name, load_onnx, load_torch)
+
+    def resolve_backend(self) -> str:
+        """
+        Backend qui produira les vecteurs, connu avant toute lecture du cache :
+        celui du modèle chargé, sinon déduit sans chargement (torch, ou ONNX int8 si l'artefact et le runtime
+        sont présents). Si l'export ONNX reste à faire, le modèle est chargé pour trancher.
+        """
+        if self._model.loaded:
+            return self.backend
+        if not onnx_backend.onnx_enabled():
+            return "torch"
+        if onnx_backend.onnx_ready(self.model_name):
+            return "onnx-int8"
+        self._model.get()
+        return self.backend
+
+    @property
+    def model(self):
+        return self._model.get()
+
+    @property
+    def model_id(self) -> str:
+        """Identifiant des vecteurs produits (clé du cache) : modèle et backend (vecteurs int8 ≠ fp32)."""
+        backend = self.resolve_backend()
+        return self.model_name if backend == "torch" else f"{self.model_name}@{backend}"
+
+    @property
+    def dimension(self) -> int:
+        """Dimension des vecteurs ; connue sans charger le modèle pour les modèles de KNOWN_DIMENSIONS."""
+        if not self._model.loaded and self.model_name in KNOWN_DIMENSIONS:
+            return KNOWN_DIMENSIONS[self.model_name]
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, text: Union[str, List[str]]) -> np.ndarray:
+        """Vecteur normalisé d'un texte (ou matrice pour une liste de textes)."""
+        if isinstance(text, str):
+            return self.encode_batch([text])[0]
+        return self.encode_batch(text)
+
+    def encode_batch(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Encode une liste de textes en une passe avant par lot, matrice (n, dim) dans l'ordre d'entrée.
+        - textes identiques encodés une seule fois
+        - tri par longueur : chaque lot regroupe des textes de taille voisine,
+          le padding (à la longueur du plus long du lot) reste minimal
+        - textes déjà vus (cache mémoire / disque) servis sans inférence
+        """
+        batch_size = batch_size or self.batch_size
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        unique = list(dict.fromkeys(texts))
+        model_id = self.model_id
+        vectors: Dict[str, np.ndarray] = self.cache.get_many(model_id, unique) if self.cache else {}
+        missing = [text for text in unique if text not in vectors]
+
+        # Inférence nécessaire : le modèle chargé fixe le backend. Si le chargement ONNX a échoué (repli torch),
+        # les vecteurs lus sous l'identifiant prévu ne sont pas comparables et sont relus sous le bon.
+        if missing and self._model.get() is not None and self.model_id != model_id:
+            model_id = self.model_id
+            vectors = self.cache.get_many(model_id, unique) if self.cache else {}
+            missing = [text for text in unique if text not in vectors]
+        missing.sort(key=len)
+
+        computed = {}
+        for start in range(0, len(missing), batch_size):
+            bucket = missing[start:start + batch_size]
+            encoded = self.model.encode(
+                bucket, batch_size=len(bucket), normalize_embeddings=True, convert_to_numpy=True
+            )
+            computed.update(zip(bucket, encoded))
+
+        if computed and self.cache:
+            self.cache.put_many(model_id, computed)
+        vectors.update(computed)
+        return np.stack([vectors[text] for text in texts])
+
+    # ------------------------------------------------------------
+    # 📄 DOCUMENTS LONGS : FENÊTRES GLISSANTES
+    # ------------------------------------------------------------
+    @property
+    def max_tokens(self) -> int:
+        """Tokens utiles par fenêtre : longueur max du modèle moins [CLS] / [SEP]."""
+        return self.model.max_seq_length - 2
+
+    def window_text(self, text: str = "", sentences: Optional[List[str]] = None,
+                    overlap_tokens: int = DEFAULT_WINDOW_OVERLAP) -> List[str]:
+        """Découpe en fenêtres alignées sur les phrases, à la taille exacte vue par le modèle."""
+        sentences = split_sentences(text) if sentences is None else sentences
+        if not any(s and s.strip() for s in sentences):
+            return []
+        return token_windows(sentences, self.model.tokenizer, self.max_tokens, overlap_tokens)
+
+    def embed_document(self, text: str = "", sentences: Optional[List[str]] = None,
+                       overlap_tokens: int = DEFAULT_WINDOW_OVERLAP) -> Dict[str, object]:
+        """
+        Embedding d'un document de longueur quelconque sans troncature :
+        fenêtres encodées par lots, vecteur du document = moyenne des fenêtres pondérée
+        par leur nombre de tokens, renormalisée. Les vecteurs par fenêtre sont conservés.
+        """
+        windows = self.window_text(text, sentences, overlap_tokens)
+        if not windows:
+            return {"vector": np.zeros(self.dimension, dtype=np.float32), "windows": []}
+
+        vectors = self.encode_batch(windows)
+        weights = np.array(
+            [len(ids) for ids in self.model.tokenizer(windows, add_special_tokens=False)["input_ids"]],
+            dtype=np.float32
+        )
+        pooled = (vectors * weights[:, None]).sum(axis=0) / max(weights.sum(), 1.0)
+        pooled = pooled / max(float(np.linalg.norm(pooled)), 1e-12)
+        return {
+            "vector": pooled.astype(np.float32),
+            "windows": [{"text": w, "vector": v} for w, v in zip(windows, vectors)]
+        }
+
+    def __repr__(self):
+        return (f"EmbeddingService(model_name='{self.model_name}', backend='{self.backend}', "
+                f"loaded={self._model.loaded})")
+
+
+# ------------------------------------------------------------
+# 🌐 INSTANCE PARTAGÉE PAR MODÈLE
+# ------------------------------------------------------------
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: str = DEFAULT_EMBEDDING_MODEL) -> EmbeddingService:
+    """Service partagé : construire l'objet ne charge rien, le modèle arrive au premier encode."""
+    key = canonical_model_name(model_name)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = EmbeddingService(key, cache=get_embedding_cache())
+            _services[key] = service
+        return service
@@ -1,64 +1,215 @@
 import ssl
+import time
 import socket
+import asyncio
 import datetime
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Iterable, Tuple
 
 class ExtractSSL:
-    _certificates: List['ExtractSSL'] = []
+    # Registre faible : les objets ExtractSSL ne sont pas retenus par la classe
+    _certificates: 'weakref.WeakSet[ExtractSSL]' = weakref.WeakSet()
+    _created_total = 0
+    _registry_lock = threading.Lock()
+    _shared_context: Optional[ssl.SSLContext] = None
 
-    def __init__(self, url: str):
+    # Cache des certificats par hostname : {hostname: (expiration, info)}
+    _cache: Dict[str, Tuple[float, Dict]] = {}
+    _cache_lock = threading.Lock()
+    CACHE_TTL = 3600
+    ERROR_TTL = 60  # Les échecs sont mémorisés moins longtemps
+    CACHE_MAX_SIZE = 1024  # Cache borné : mémoire stable sur un worker de longue durée
+    TIMEOUT = 5
+
+    def __init__(self, url: str, fetch: bool = True, use_cache: bool = True):
         if not url.startswith(("http://", "https://")):
             url = "https://" + url
 
         self.url = url
         self.parsed_url = urlparse(url)
         self.hostname = self.parsed_url.hostname
-        self.context = ssl.create_default_context()
+        self.context = ExtractSSL.default_context()
         self.info: Optional[Dict] = None
 
-        # Ajout à la liste globale
-        ExtractSSL._certificates.append(self)
+        # Ajout au registre global
+        with ExtractSSL._registry_lock:
+            ExtractSSL._certificates.add(self)
+            ExtractSSL._created_total += 1
+
+        # Récupération automatique du certificat (fetch=False : aucune I/O réseau à la construction)
+        if fetch:
+            self._fetch_certificate(use_cache)
+
+    @classmethod
+    def default_context(cls) -> ssl.SSLContext:
+        """Contexte SSL partagé (les certificats racine ne sont chargés qu'une fois)"""
+        with cls._registry_lock:
+            if cls._shared_context is None:
+                cls._shared_context = ssl.create_default_context()
+            return cls._shared_context
 
-        # Récupération automatique du certificat
-        self._fetch_certificate()
+    @classmethod
+    def instance_metrics(cls) -> Dict[str, int]:
+        """Instances vivantes, total créé et taille du cache de certificats"""
+        with cls._registry_lock:
+            live, total = len(cls._certificates), cls._created_total
+        with cls._cache_lock:
+            cached = len(cls._cache)
+        return {"live": live, "total": total, "cached_hosts": cached}
 
-    def _fetch_certificate(self):
+    def fetch(self, use_cache: bool = True) -> Dict:
+        """Récupère le certificat si ce n'est pas déjà fait et retourne self.info"""
+        if self.info is None:
+            self._fetch_certificate(use_cache)
+        return self.info
+
+    def _fetch_certificate(self, use_cache: bool = True):
         """Récupère les informations du certificat SSL et les stocke dans self.info"""
         if not self.hostname:
             self.info = {"error": "Invalid URL or hostname not found."}
             return
 
+        cached = self.cached_info(self.hostname) if use_cache else None
+        if cached is not None:
+            self.info = {**cached, "url": self.url}
+            return
+
         try:
             # Connexion sécurisée
-            with socket.create_connection((self.hostname, 443), timeout=5) as sock:
+            with socket.create_connection((self.hostname, 443), timeout=self.TIMEOUT) as sock:
                 with self.context.wrap_socket(sock, server_hostname=self.hostname) as ssock:
                     cert = ssock.getpeercert()
-
-            # Extraction des informations principales
-            subject = dict(x[0] for x in cert.get('subject', []))
-            issuer = dict(x[0] for x in cert.get('issuer', []))
-            not_before = datetime.datetime.strptime(cert['notBefore'], '%b %d %H:%M:%S %Y %Z')
-            not_after = datetime.datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-
-            self.info = {
-                "url": self.url,
-                "hostname": self.hostname,
-                "common_name": subject.get('commonName'),
-                "issuer": issuer.get('commonName'),
-                "valid_from": not_before.strftime('%Y-%m-%d %H:%M:%S'),
-                "valid_until": not_after.strftime('%Y-%m-%d %H:%M:%S'),
-                "is_valid_now": not_before <= datetime.datetime.utcnow() <= not_after
-            }
+            info = self.parse_certificate(self.hostname, cert)
 
         except ssl.SSLError as e:
-            self.info = {"url": self.url, "error": f"SSL Error: {e}"}
+            info = {"error": f"SSL Error: {e}"}
         except socket.timeout:
-            self.info = {"url": self.url, "error": "Connection timed out."}
+            info = {"error": "Connection timed out."}
         except socket.gaierror:
-            self.info = {"url": self.url, "error": "Domain name not found."}
+            info = {"error": "Domain name not found."}
         except Exception as e:
-            self.info = {"url": self.url, "error": f"Unknown error: {e}"}
-    
-        def __repr__(self):
-            return f"ExtractSSL(url='{self.url}', hostname='{self.hostname}')"
+            info = {"error": f"Unknown error: {e}"}
+
+        self.store_info(self.hostname, info)
+        self.info = {**info, "url": self.url}
+
+    @staticmethod
+    def parse_certificate(hostname: str, cert: Dict) -> Dict:
+        """Extraction des informations principales du certificat"""
+        subject = dict(x[0] for x in cert.get('subject', []))
+        issuer = dict(x[0] for x in cert.get('issuer', []))
+        not_before = datetime.datetime.strptime(cert['notBefore'], '%b %d %H:%M:%S %Y %Z')
+        not_after = datetime.datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
+
+        return {
+            "hostname": hostname,
+            "common_name": subject.get('commonName'),
+            "issuer": issuer.get('commonName'),
+            "valid_from": not_before.strftime('%Y-%m-%d %H:%M:%S'),
+            "valid_until": not_after.strftime('%Y-%m-%d %H:%M:%S'),
+            "is_valid_now": not_before <= datetime.datetime.utcnow() <= not_after
+        }
+
+    # ------------------------------------------------------------
+    # 🗄️ CACHE PAR HOSTNAME
+    # ------------------------------------------------------------
+    @classmethod
+    def cached_info(cls, hostname: str) -> Optional[Dict]:
+        """Copie de l'entrée du cache (l'appelant peut la modifier sans altérer le cache)"""
+        with cls._cache_lock:
+            entry = cls._cache.get(hostname)
+            if entry is None:
+                return None
+            expires_at, info = entry
+            if expires_at < time.monotonic():
+                del cls._cache[hostname]
+                return None
+            return dict(info)
+
+    @classmethod
+    def store_info(cls, hostname: str, info: Dict):
+        ttl = cls.ERROR_TTL if "error" in info else cls.CACHE_TTL
+        with cls._cache_lock:
+            cls._cache.pop(hostname, None)
+            cls._cache[hostname] = (time.monotonic() + ttl, dict(info))
+            # Les entrées les plus anciennes (ordre d'insertion) sortent en premier
+            while len(cls._cache) > cls.CACHE_MAX_SIZE:
+                del cls._cache[next(iter(cls._cache))]
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    # ------------------------------------------------------------
+    # ⚡ SONDAGE ASYNCHRONE PAR LOT
+    # ------------------------------------------------------------
+    @classmethod
+    async def _probe_host(cls, hostname: str, semaphore: asyncio.Semaphore) -> Dict:
+        cached = cls.cached_info(hostname)
+        if cached is not None:
+            return cached
+
+        async with semaphore:
+            writer = None
+            try:
+                context = cls.default_context()
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(hostname, 443, ssl=context, server_hostname=hostname),
+                    timeout=cls.TIMEOUT
+                )
+                info = cls.parse_certificate(hostname, writer.get_extra_info("peercert"))
+            except ssl.SSLError as e:
+                info = {"error": f"SSL Error: {e}"}
+            except asyncio.TimeoutError:
+                info = {"error": "Connection timed out."}
+            except socket.gaierror:
+                info = {"error": "Domain name not found."}
+            except Exception as e:
+                info = {"error": f"Unknown error: {e}"}
+            finally:
+                if writer is not None:
+                    writer.close()
+                    try:
+                        await writer.wait_closed()
+                    except Exception:
+                        pass
+
+        cls.store_info(hostname, info)
+        return info
+
+    @classmethod
+    async def aprobe_many(cls, urls: Iterable[str], max_concurrency: int = 10) -> Dict[str, Dict]:
+        """Version coroutine de probe_many"""
+        hostnames = []
+        for url in urls:
+            if not url.startswith(("http://", "https://")):
+                url = "https://" + url
+            hostname = urlparse(url).hostname
+            if hostname and hostname not in hostnames:
+                hostnames.append(hostname)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        infos = await asyncio.gather(*(cls._probe_host(h, semaphore) for h in hostnames))
+        return dict(zip(hostnames, infos))
+
+    @classmethod
+    def probe_many(cls, urls: Iterable[str], max_concurrency: int = 10) -> Dict[str, Dict]:
+        """
+        Récupère en parallèle les certificats de plusieurs hôtes (un handshake par hostname) : {hostname: info}.
+        Appelable depuis du code synchrone, y compris quand une boucle asyncio tourne déjà dans ce thread
+        (la coroutine s'exécute alors dans un thread dédié) ; dans une coroutine, préférer `await aprobe_many(...)`.
+        """
+        urls = list(urls)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(cls.aprobe_many(urls, max_concurrency))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, cls.aprobe_many(urls, max_concurrency)).result()
+
+    def __repr__(self):
+        return f"ExtractSSL(url='{self.url}', hostname='{self.hostname}')"
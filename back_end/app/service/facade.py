@@ -1,4 +1,5 @@
 import os
+import json
 import threading
 from dotenv import load_dotenv
 from datetime import datetime
@@ -8,18 +9,26 @@ from app.models.user import User
 from app.models.audit import Audit
 from app.persistence.repository import UserRepository, AuditRepository
 from app.service.content_scraper import ContentScraper
-from app.service.nlp_preprocessor import NLPPreprocessor
+from app.service.nlp_preprocessor import NLPPreprocessor, DEFAULT_NLP_PROFILE
 from app.service.semantic_matcher import SemanticMatcher
 from app.service.prompt_generator import PromptGenerator
 from app.service.perplexity_auditor import PerplexityAuditor
 from app.service.extraction_docs import GDPRScraper
 from app.service.rgpd_updater import RGPDUpdater
-from sentence_transformers import SentenceTransformer
+from app.service.content_fingerprint import content_hash
+from app.service.embedding_service import get_embedding_service
 import schedule
 import time
 
 load_dotenv()
 
+# Paramètres du matching RGPD : les changer invalide la réutilisation des pages des audits précédents
+MATCH_THRESHOLD = float(os.getenv("MATCH_THRESHOLD", "0.75"))
+MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "3"))
+
+# Vecteurs bruts : utiles au matching en mémoire, jamais stockés dans le contenu de l'audit
+VECTOR_KEYS = ("vector", "snippet_vectors")
+
 
 class Facade:
     def __init__(self):
@@ -30,7 +39,7 @@ class Facade:
         # Services
         self.scraper = ContentScraper()
         self.nlp = NLPPreprocessor()
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedder = get_embedding_service()  # MiniLM partagé (chargé au premier encode)
 
         # RGPD
         self.gdpr_scraper = GDPRScraper()
@@ -90,6 +99,13 @@ class Facade:
             "policy_version": "1.0"
         }
 
+    @staticmethod
+    def rgpd_fingerprint(rgpd_data) -> str:
+        """Hash du référentiel RGPD utilisé pour le matching (hors horodatage de la requête)"""
+        if isinstance(rgpd_data, dict):
+            rgpd_data = {k: v for k, v in rgpd_data.items() if k != "timestamp"}
+        return content_hash(json.dumps(rgpd_data, sort_keys=True, ensure_ascii=False, default=str))
+
     def start_rgpd_scheduler(self):
         """Lance un thread pour vérifier le RGPD chaque lundi à 09:00"""
         schedule.every().monday.at("09:00").do(self.update_rgpd)
@@ -120,7 +136,8 @@ class Facade:
     # =======================================================
     # AUDITS
     # =======================================================
-    def create_audit(self, user_id: str, site: str, run_perplexity: bool = False) -> Optional[dict]:
+    def create_audit(self, user_id: str, site: str, run_perplexity: bool = False,
+                     nlp_profile: Optional[str] = None) -> Optional[dict]:
         user = self.user_repo.get(user_id)
         if not user:
             return None
@@ -129,50 +146,37 @@ class Facade:
         self.update_rgpd()
         rgpd_data = self.get_rgpd_data()
 
-        # --- Scraping ---
-        static_data = self.scraper.scrape_static(site)
-        dynamic_data = self.scraper.scrape_dynamic(site)
+        # --- Scraping (Selenium seulement si le HTML serveur ne suffit pas) ---
+        static_data, dynamic_data = self.scraper.scrape_page(site)
         html_text = dynamic_data.get("html_text_snippet", "")
 
-        # --- NLP local / embeddings ---
-        nlp_output = self.nlp.nlp_pipeline(html_text)
-        enriched_sections = []
-
-        if isinstance(nlp_output, dict) and "analysis" in nlp_output:
-            enriched_sections.append({
-                "type": "text",
-                "url_source": site,
-                "contenu": nlp_output["analysis"],
-                "nlp": {"vector": []}
-            })
-        else:
-            for text in nlp_output.get("snippets", [html_text]):
-                vector = self.embedder.encode(text).tolist()
-                enriched_sections.append({
-                    "type": "text",
-                    "url_source": site,
-                    "contenu": text,
-                    "nlp": {"vector": vector}
-                })
-
-        # --- Semantic Matching & Prompt ---
-        semantic_matcher = SemanticMatcher(
-            site_data=[{"url": site, "sections": enriched_sections}],
-            rgpd_data=rgpd_data
-        )
-        prompt_data_dict = semantic_matcher.build_prompt_data()
+        # --- Audit précédent : pages inchangées réutilisées telles quelles ---
+        previous = self.audit_repo.get_latest_by_user_and_site(user_id, site)
+        previous_content = previous.content if previous else {}
+        previous_pages = previous_content.get("pages", {})
+
+        # --- NLP local / embeddings / matching (pages modifiées seulement) ---
+        page = self.analyze_page(site, html_text, rgpd_data, previous_pages.get(site), profile=nlp_profile)
+        # Sortie NLP stockée une seule fois, au niveau de l'audit (reprise telle quelle si la page est réutilisée)
+        nlp_output = page.pop("nlp_output", None) if not page["reused"] \
+            else self.without_vectors(previous_content.get("nlp_output"))
+        pages = {site: page}
+        prompt_data_dict = {url: p["matches"] for url, p in pages.items()}
         prompt_generator = PromptGenerator()
         prompt_payload = prompt_generator.generate_prompt(prompt_data_dict)
 
-        # --- Appel Perplexity (optionnel) ---
+        # --- Appel Perplexity (optionnel, évité si le prompt n'a pas changé) ---
         perplexity_report = None
         if run_perplexity:
-            api_key = os.getenv("PERPLEXITY_API_KEY")
-            if api_key:
-                auditor = PerplexityAuditor(api_key=api_key)
-                perplexity_report = auditor.run(prompt_payload=prompt_payload)
+            if previous_content.get("perplexity_report") and previous_content.get("prompt_data") == prompt_payload:
+                perplexity_report = previous_content["perplexity_report"]
             else:
-                print("⚠️ Aucune clé API Perplexity trouvée dans .env")
+                api_key = os.getenv("PERPLEXITY_API_KEY")
+                if api_key:
+                    auditor = PerplexityAuditor(api_key=api_key)
+                    perplexity_report = auditor.run(prompt_payload=prompt_payload)
+                else:
+                    print("⚠️ Aucune clé API Perplexity trouvée dans .env")
 
         # --- Enregistrement output temporaire ---
         temp_id = f"{user_id}_{site}_{datetime.now().isoformat()}"
@@ -181,7 +185,8 @@ class Facade:
             "dynamic": dynamic_data,
             "nlp_output": nlp_output,
             "prompt_data": prompt_payload,
-            "perplexity_report": perplexity_report
+            "perplexity_report": perplexity_report,
+            "pages": pages
         })
 
         # --- Création & stockage Audit dans DB via repository ---
@@ -194,6 +199,69 @@ class Facade:
 
         return audit.to_dict() if audit else None
 
+    def analyze_page(self, url: str, text: str, rgpd_data: dict, previous: Optional[dict] = None,
+                     profile: Optional[str] = None) -> dict:
+        """
+        NLP (profil fast / standard / deep), embeddings et matching RGPD d'une page.
+        Les matches de l'audit précédent sont repris sans repasser par les étapes coûteuses si tout
+        ce qui les détermine est inchangé : contenu, profil, référentiel RGPD, modèle d'embeddings et seuil.
+        Retourne la clé de réutilisation, les matches et la sortie NLP (sans vecteurs bruts).
+        """
+        key = {
+            "content_hash": content_hash(text),
+            "profile": profile or DEFAULT_NLP_PROFILE,
+            "rgpd_hash": self.rgpd_fingerprint(rgpd_data),
+            "model_id": self.embedder.model_id,
+            "threshold": MATCH_THRESHOLD,
+            "top_k": MATCH_TOP_K
+        }
+        if previous and all(previous.get(name) == value for name, value in key.items()):
+            return {**key, "matches": previous.get("matches", {"sections": []}), "reused": True}
+
+        nlp_output = self.nlp.nlp_pipeline(text, profile=key["profile"])
+        enriched_sections = []
+
+        if isinstance(nlp_output, dict) and "analysis" in nlp_output:
+            enriched_sections.append({
+                "type": "text",
+                "url_source": url,
+                "contenu": nlp_output["analysis"],
+                "nlp": {"vector": []}
+            })
+        else:
+            snippets = nlp_output.get("snippets", [text])
+            # Vecteurs des fenêtres déjà calculés par le NLP local, sinon encodage par lot
+            vectors = nlp_output.get("snippet_vectors") or self.embedder.encode_batch(snippets).tolist()
+            for snippet, vector in zip(snippets, vectors):
+                enriched_sections.append({
+                    "type": "text",
+                    "url_source": url,
+                    "contenu": snippet,
+                    "nlp": {"vector": vector}
+                })
+
+        semantic_matcher = SemanticMatcher(
+            site_data=[{"url": url, "sections": enriched_sections}],
+            rgpd_data=rgpd_data
+        )
+        matches = semantic_matcher.build_prompt_data(threshold=MATCH_THRESHOLD, top_k=MATCH_TOP_K).get(
+            url, {"sections": []}
+        )
+
+        return {
+            **key,
+            "matches": matches,
+            "nlp_output": self.without_vectors(nlp_output),
+            "reused": False
+        }
+
+    @staticmethod
+    def without_vectors(nlp_output):
+        """Sortie NLP sans les vecteurs (document et fenêtres) : seuls le texte et les analyses sont conservés"""
+        if not isinstance(nlp_output, dict):
+            return nlp_output
+        return {k: v for k, v in nlp_output.items() if k not in VECTOR_KEYS}
+
     def list_audits(self, user_id: str) -> List[dict]:
         audits = self.audit_repo.list_by_user(user_id)
         return [a.to_dict() for a in audits]
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from app.service.url_utils import normalize_url
+from app.service.data_paths import data_path
+from app.service.sqlite_lru import SqliteLru
+
+DEFAULT_CACHE_PATH = data_path("http_cache.sqlite")
+
+# En-têtes d'une réponse 304 qui remplacent ceux de la copie en cache (RFC 9111, 4.3.4)
+REVALIDATION_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Expires", "Date", "Age", "Vary")
+
+
+class HttpCache:
+    """
+    Cache disque des réponses HTTP (SQLite, partagé entre processus) :
+    - clé = URL normalisée
+    - ETag / Last-Modified conservés pour revalider avec If-None-Match / If-Modified-Since
+    - réponse servie sans requête tant qu'elle a moins de `ttl` secondes
+    - éviction LRU dès que la taille totale dépasse `max_bytes`, dates d'accès écrites par lot
+      au plus toutes les `access_flush_interval` secondes (SqliteLru)
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = 3600,
+                 max_bytes: int = 200 * 1024 * 1024, access_flush_interval: float = 30):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.access_flush_interval = access_flush_interval
+        self._lock = threading.Lock()
+        self._lru = SqliteLru("responses", "url", "size", max_bytes, access_flush_interval)
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL,
+                accessed_at REAL,
+                size INTEGER
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+
+    # ------------------------------------------------------------
+    # 🔎 LECTURE
+    # ------------------------------------------------------------
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        key = normalize_url(url)
+        with self._lock:
+            row = self._select(key)
+            if row is None:
+                return None
+            self._lru.touch(key)
+            if self._lru.flush_due():
+                self._lru.flush(self._conn)
+                self._conn.commit()
+        return self._entry(row)
+
+    def _select(self, key: str):
+        return self._conn.execute(
+            "SELECT url, status, headers, body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+            (key,)
+        ).fetchone()
+
+    @staticmethod
+    def _entry(row) -> Dict[str, Any]:
+        return {
+            "url": row[0],
+            "status": row[1],
+            "headers": json.loads(row[2] or "{}"),
+            "body": row[3],
+            "etag": row[4],
+            "last_modified": row[5],
+            "fetched_at": row[6]
+        }
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - (entry.get("fetched_at") or 0) < self.ttl
+
+    @staticmethod
+    def validation_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def to_response(entry: Dict[str, Any], url: str) -> requests.Response:
+        """Reconstruit un requests.Response à partir d'une entrée du cache."""
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response._content = entry["body"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.url = url
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    # ------------------------------------------------------------
+    # 💾 ÉCRITURE
+    # ------------------------------------------------------------
+    def store(self, url: str, response: requests.Response):
+        """Enregistre une réponse 200 (sauf Cache-Control: no-store)."""
+        if response.status_code != 200 or "no-store" in response.headers.get("Cache-Control", ""):
+            return
+        body = response.content or b""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    normalize_url(url), response.status_code, json.dumps(dict(response.headers)), body,
+                    response.headers.get("ETag"), response.headers.get("Last-Modified"), now, now, len(body)
+                )
+            )
+            self._lru.evict(self._conn)
+            self._conn.commit()
+
+    def refresh(self, url: str, response: Optional[requests.Response] = None) -> Optional[Dict[str, Any]]:
+        """
+        Réponse 304 : la copie en cache redevient fraîche. Les validateurs (ETag, Last-Modified)
+        et en-têtes de fraîcheur renvoyés remplacent les anciens. Retourne l'entrée à jour.
+        """
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._select(key)
+            if row is None:
+                return None
+            entry = self._entry(row)
+            if response is not None:
+                headers = CaseInsensitiveDict(entry["headers"])
+                for name in REVALIDATION_HEADERS:
+                    if response.headers.get(name):
+                        headers[name] = response.headers[name]
+                entry["headers"] = dict(headers)
+                entry["etag"] = response.headers.get("ETag") or entry["etag"]
+                entry["last_modified"] = response.headers.get("Last-Modified") or entry["last_modified"]
+            entry["fetched_at"] = now
+            self._lru.forget(key)
+            self._conn.execute(
+                "UPDATE responses SET headers = ?, etag = ?, last_modified = ?, fetched_at = ?, accessed_at = ? "
+                "WHERE url = ?",
+                (json.dumps(entry["headers"]), entry["etag"], entry["last_modified"], now, now, key)
+            )
+            self._conn.commit()
+        return entry
+
+    def flush(self):
+        """Force l'écriture des dates d'accès en attente."""
+        with self._lock:
+            self._lru.flush(self._conn)
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._lru.forget()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def __repr__(self):
+        return f"HttpCache(path='{self.path}', ttl={self.ttl}, max_bytes={self.max_bytes})"
@@ -0,0 +1,116 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.service.http_cache import HttpCache, DEFAULT_CACHE_PATH
+
+
+class HttpClient:
+    """
+    Client HTTP partagé : connexions keep-alive réutilisées (requests.Session + pool urllib3)
+    et récupération concurrente de plusieurs URLs avec une limite de connexions par hôte.
+    Avec un HttpCache, les GET sont servis depuis le disque ou revalidés (304).
+    """
+
+    def __init__(self, max_workers: int = 8, per_host_limit: int = 4, timeout: float = 10,
+                 cache: Optional[HttpCache] = None):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.cache = cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max(per_host_limit, max_workers))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+            return slot
+
+    def get(self, url: str, timeout: Optional[float] = None, use_cache: bool = True, **kwargs) -> requests.Response:
+        """GET sur une connexion du pool (au plus `per_host_limit` requêtes simultanées par hôte)."""
+        entry = self.cache.lookup(url) if (self.cache and use_cache) else None
+        if entry and self.cache.is_fresh(entry):
+            return HttpCache.to_response(entry, url)
+
+        if entry:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers.update(HttpCache.validation_headers(entry))
+            kwargs["headers"] = headers
+
+        with self._slot(url):
+            response = self.session.get(url, timeout=timeout or self.timeout, **kwargs)
+
+        if self.cache and use_cache:
+            if entry and response.status_code == 304:
+                return HttpCache.to_response(self.cache.refresh(url, response) or entry, url)
+            self.cache.store(url, response)
+        return response
+
+    def fetch_many(self, urls: Iterable[str], timeout: Optional[float] = None) -> Dict[str, Optional[requests.Response]]:
+        """
+        Récupère toutes les URLs en parallèle (chaque URL une seule fois).
+        Retourne {url: Response} ; None si la requête a échoué ou a renvoyé une erreur HTTP.
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return {}
+
+        def fetch(url):
+            try:
+                response = self.get(url, timeout=timeout)
+                response.raise_for_status()
+                return response
+            except requests.RequestException:
+                return None
+
+        workers = min(self.max_workers, len(unique_urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            responses = list(executor.map(fetch, unique_urls))
+        return dict(zip(unique_urls, responses))
+
+    def close(self):
+        if self.cache:
+            self.cache.flush()
+        self.session.close()
+
+    def __repr__(self):
+        return f"HttpClient(max_workers={self.max_workers}, per_host_limit={self.per_host_limit})"
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Client HTTP partagé par le process (pool de connexions commun)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            cache = None
+            if os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true":
+                cache = HttpCache(
+                    path=os.getenv("HTTP_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    ttl=float(os.getenv("HTTP_CACHE_TTL", "3600")),
+                    max_bytes=int(os.getenv("HTTP_CACHE_MAX_MB", "200")) * 1024 * 1024
+                )
+            _client = HttpClient(
+                max_workers=int(os.getenv("HTTP_MAX_WORKERS", "8")),
+                per_host_limit=int(os.getenv("HTTP_PER_HOST_LIMIT", "4")),
+                cache=cache
+            )
+        return _client
@@ -0,0 +1,100 @@
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class KeywordMatcher:
+    """
+    Automate Aho-Corasick multi-motifs, compilé une fois par jeu de mots-clés.
+    Un seul passage sur le texte (insensible à la casse) retourne toutes les occurrences
+    de tous les thèmes, avec leurs positions dans le texte d'origine.
+    """
+
+    def __init__(self, themes: Dict[str, Iterable[str]]):
+        self.themes = {theme: list(keywords) for theme, keywords in themes.items()}
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, str, int]]] = [[]]  # (thème, mot-clé, longueur)
+        self._max_len = 1
+
+        for theme, keywords in self.themes.items():
+            for keyword in keywords:
+                self._add(theme, keyword)
+        self._build_failure_links()
+
+    def _add(self, theme: str, keyword: str):
+        pattern = keyword.lower()
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((theme, keyword, len(pattern)))
+        self._max_len = max(self._max_len, len(pattern))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    # ------------------------------------------------------------
+    # 🔎 RECHERCHE
+    # ------------------------------------------------------------
+    def iter_matches(self, text: str) -> Iterator[Tuple[str, str, int, int]]:
+        """Génère (thème, mot-clé, début, fin) ; positions exprimées dans `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        # Index d'origine des derniers caractères en minuscules (lower() peut allonger un caractère)
+        origins = deque(maxlen=self._max_len)
+        for index, original in enumerate(text or ""):
+            for ch in original.lower():
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+                origins.append(index)
+                for theme, keyword, length in out[state]:
+                    yield theme, keyword, origins[-length], index + 1
+
+    def scan(self, text: str) -> Dict[str, List[Dict[str, object]]]:
+        """{thème: [{"keyword", "start", "end"}, ...]} pour chaque thème présent dans le texte."""
+        hits: Dict[str, List[Dict[str, object]]] = {}
+        for theme, keyword, start, end in self.iter_matches(text):
+            hits.setdefault(theme, []).append({"keyword": keyword, "start": start, "end": end})
+        return hits
+
+    def detect(self, text: str) -> Dict[str, bool]:
+        """{thème: bool} pour tous les thèmes du jeu de mots-clés."""
+        hits = self.scan(text)
+        return {theme: theme in hits for theme in self.themes}
+
+    def contains_any(self, text: str) -> bool:
+        """True dès la première occurrence (arrêt anticipé)."""
+        return next(self.iter_matches(text), None) is not None
+
+    def __repr__(self):
+        return f"KeywordMatcher(themes={list(self.themes)}, states={len(self._goto)})"
+
+
+@lru_cache(maxsize=32)
+def _compile(frozen_themes: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> KeywordMatcher:
+    return KeywordMatcher(dict(frozen_themes))
+
+
+def get_keyword_matcher(themes: Dict[str, Iterable[str]]) -> KeywordMatcher:
+    """Automate partagé pour un jeu de mots-clés donné (compilé une seule fois)."""
+    return _compile(tuple((theme, tuple(keywords)) for theme, keywords in themes.items()))
@@ -0,0 +1,54 @@
+from typing import Set, Tuple
+from urllib.parse import urlsplit, unquote
+
+from app.service.keyword_matcher import get_keyword_matcher
+
+# Catégories de preuves RGPD et mots-clés (texte d'ancre ou chemin d'URL)
+GDPR_LINK_CATEGORIES = {
+    "confidentialite": ["privacy", "confidentialit", "données personnelles", "donnees-personnelles",
+                        "vie privée", "vie-privee", "rgpd", "gdpr", "data protection", "protection des données"],
+    "cookies": ["cookie", "traceur", "consentement"],
+    "mentions": ["mentions légales", "mentions-legales", "legal", "imprint", "impressum", "cgu", "conditions générales"],
+    "contact": ["contact", "nous-contacter", "nous contacter"],
+    "newsletter": ["newsletter", "inscription", "subscribe", "abonnement"]
+}
+
+ANCHOR_WEIGHT = 3.0
+PATH_WEIGHT = 2.0
+# Les liens RGPD sont presque toujours dans le pied de page
+REGION_BONUS = {"footer": 2.0, "nav": 0.5, "main": 0.0, "other": 0.0}
+
+_REGION_TAGS = {"footer": "footer", "nav": "nav", "header": "nav", "main": "main", "article": "main"}
+
+
+def link_region(a_tag) -> str:
+    """Position DOM d'un lien : footer, nav, main ou other (balise ou id/class de l'ancêtre)."""
+    for parent in a_tag.parents:
+        if parent.name in _REGION_TAGS:
+            return _REGION_TAGS[parent.name]
+        markers = " ".join([parent.get("id") or ""] + list(parent.get("class") or [])).lower() \
+            if hasattr(parent, "get") else ""
+        if "footer" in markers:
+            return "footer"
+        if "nav" in markers or "menu" in markers:
+            return "nav"
+    return "other"
+
+
+def url_categories(url: str) -> Set[str]:
+    """Catégories RGPD déduites du seul chemin de l'URL."""
+    path = unquote(urlsplit(url).path).lower()
+    return set(get_keyword_matcher(GDPR_LINK_CATEGORIES).scan(path))
+
+
+def score_link(url: str, anchor_text: str = "", region: str = "other") -> Tuple[float, Set[str]]:
+    """Score de priorité d'un lien et catégories RGPD qu'il semble couvrir."""
+    matcher = get_keyword_matcher(GDPR_LINK_CATEGORIES)
+    anchor_hits = set(matcher.scan(anchor_text or ""))
+    path_hits = url_categories(url)
+    categories = anchor_hits | path_hits
+
+    score = ANCHOR_WEIGHT * len(anchor_hits) + PATH_WEIGHT * len(path_hits)
+    if categories:
+        score += REGION_BONUS.get(region, 0.0)
+    return score, categories
@@ -0,0 +1,120 @@
+import os
+import sys
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Budget de démarrage à froid (secondes) : import du module NLP + chargement des modèles
+DEFAULT_COLD_START_BUDGET = float(os.getenv("NLP_COLD_START_BUDGET", "60"))
+
+
+class LazyResource:
+    """
+    Modèle (ou ressource coûteuse) chargé au premier usage, une seule fois par processus.
+    Thread-safe : si plusieurs requêtes arrivent pendant le chargement, une seule charge,
+    les autres attendent le résultat. La durée de chargement est mesurée.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self._loader = loader
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self) -> Any:
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                self._value = self._loader()
+                self.load_seconds = time.perf_counter() - start
+                self._loaded = True
+                print(f"⏱️ Modèle '{self.name}' chargé en {self.load_seconds:.2f}s")
+        return self._value
+
+    def __repr__(self):
+        return f"LazyResource(name='{self.name}', loaded={self._loaded})"
+
+
+# ------------------------------------------------------------
+# 📦 REGISTRE DES RESSOURCES DU PROCESSUS
+# ------------------------------------------------------------
+_resources: Dict[str, LazyResource] = {}
+_resources_lock = threading.Lock()
+
+
+def lazy_resource(name: str, loader: Callable[[], Any]) -> LazyResource:
+    """Déclare une ressource paresseuse (la même instance est retournée pour un même nom)."""
+    with _resources_lock:
+        resource = _resources.get(name)
+        if resource is None:
+            resource = LazyResource(name, loader)
+            _resources[name] = resource
+        return resource
+
+
+def warm_up(names: Optional[Iterable[str]] = None, budget: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Précharge les ressources indiquées (toutes par défaut) et compare le temps total au budget.
+    Un échec de chargement est signalé sans interrompre les autres.
+    """
+    budget = DEFAULT_COLD_START_BUDGET if budget is None else budget
+    names = None if names is None else set(names)
+    with _resources_lock:
+        selected = [r for n, r in _resources.items() if names is None or n in names]
+
+    start = time.perf_counter()
+    errors = {}
+    for resource in selected:
+        try:
+            resource.get()
+        except Exception as e:
+            errors[resource.name] = str(e)
+            print(f"⚠️ Échec du chargement de '{resource.name}' : {e}")
+    elapsed = time.perf_counter() - start
+
+    report = cold_start_report(budget)
+    report["warm_up_seconds"] = round(elapsed, 3)
+    report["errors"] = errors
+    if not report["within_budget"]:
+        print(f"⚠️ Démarrage à froid hors budget : {report['total_seconds']}s > {budget}s")
+    return report
+
+
+def cold_start_report(budget: Optional[float] = None) -> Dict[str, Any]:
+    """Temps de chargement de chaque ressource déjà chargée et total comparé au budget."""
+    budget = DEFAULT_COLD_START_BUDGET if budget is None else budget
+    with _resources_lock:
+        resources = list(_resources.values())
+    loads = {r.name: round(r.load_seconds, 3) for r in resources if r.loaded}
+    total = round(sum(loads.values()), 3)
+    return {
+        "loaded": loads,
+        "pending": [r.name for r in resources if not r.loaded],
+        "total_seconds": total,
+        "budget_seconds": budget,
+        "within_budget": total <= budget
+    }
+
+
+if __name__ == "__main__":
+    # Mesure : python -m app.service.model_loader [--warm-up]
+    # (registre du module importé, pas celui de __main__)
+    t0 = time.perf_counter()
+    import app.service.nlp_preprocessor  # noqa: F401
+    from app.service import model_loader
+    import_seconds = time.perf_counter() - t0
+    print(f"Import de nlp_preprocessor : {import_seconds:.2f}s")
+
+    report = model_loader.warm_up() if "--warm-up" in sys.argv else model_loader.cold_start_report()
+    report["import_seconds"] = round(import_seconds, 3)
+    report["within_budget"] = report["total_seconds"] + import_seconds <= report["budget_seconds"]
+    print(report)
+    sys.exit(0 if report["within_budget"] else 1)
@@ -1,51 +1,143 @@
 import os
 import re
-import math
-import torch
+import threading
 import requests
 from unidecode import unidecode
 from langdetect import detect, DetectorFactory
-from nltk.tokenize import word_tokenize
-from transformers import pipeline, AutoTokenizer, AutoModel
-import nltk
-import spacy
 from dotenv import load_dotenv
 import json
 
+from app.service.model_loader import lazy_resource, warm_up as warm_up_resources
+from app.service.embedding_service import get_embedding_service
+from app.service import onnx_backend
+from app.service.text_segmenter import segment_text, split_sentences
+
 # ==========================
 # 📥 Charger le fichier .env
 # ==========================
 load_dotenv()
 
 # ==========================
-# 📥 Préparations NLTK / spaCy
+# 📥 Modèles NLTK / spaCy / Hugging Face (chargés au premier usage)
+# ==========================
+# torch, transformers, spacy et nltk ne sont importés que par les loaders :
+# importer ce module reste quasi instantané, y compris en mode Perplexity.
+SENTIMENT_MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+SPACY_MODELS = {"fr": "fr_core_news_sm", "en": "en_core_web_sm", "xx": "xx_ent_wiki_sm"}
+
+# Mode spaCy : "batched" (composants inutiles désactivés, segments par phrases, nlp.pipe)
+# ou "full" (pipeline complet sur le texte entier, comportement historique)
+SPACY_MODE = os.getenv("NLP_SPACY_MODE", "batched").lower()
+# Seuls les tokens, stop/punct (attributs lexicaux) et entités sont lus : le reste est désactivé
+SPACY_PRUNED_COMPONENTS = ["parser", "lemmatizer", "tagger", "morphologizer", "attribute_ruler", "senter"]
+SPACY_SEGMENT_CHARS = int(os.getenv("SPACY_SEGMENT_CHARS", "1000"))
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "64"))
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+
+
+def _load_nltk_data():
+    import nltk
+    nltk.download("punkt", quiet=True)
+    nltk.download("stopwords", quiet=True)
+    return True
+
+
+def _spacy_loader(model_name: str):
+    def load():
+        import spacy
+        return spacy.load(model_name)
+    return load
+
+
+def _load_sentiment_pipeline():
+    def load_torch():
+        from transformers import pipeline
+        return pipeline("sentiment-analysis", model=SENTIMENT_MODEL_NAME)
+
+    # NLP_BACKEND=onnx : RoBERTa quantifié int8, torch en secours
+    return onnx_backend.load_with_fallback(
+        SENTIMENT_MODEL_NAME, lambda: onnx_backend.load_sentiment_pipeline(SENTIMENT_MODEL_NAME), load_torch
+    )
+
+
+nltk_data = lazy_resource("nltk_data", _load_nltk_data)
+spacy_models = {lang: lazy_resource(f"spacy_{lang}", _spacy_loader(name)) for lang, name in SPACY_MODELS.items()}
+embedder = get_embedding_service()  # MiniLM partagé avec Facade et SemanticMatcher
+sentiment_pipeline = lazy_resource("sentiment_pipeline", _load_sentiment_pipeline)
+
+# Ressources nécessaires au pipeline local (mode sans clé Perplexity)
+EMBEDDER_RESOURCE = f"embedder:{embedder.model_name}"
+LOCAL_RESOURCES = ["spacy_fr", "spacy_en", "spacy_xx", EMBEDDER_RESOURCE, "sentiment_pipeline"]
+# Ressources utilisées en mode Perplexity (vectorisation des sections pour le matching)
+PPLX_RESOURCES = [EMBEDDER_RESOURCE]
+
+# ==========================
+# 🎚️ Profils du pipeline local : étapes exécutées en plus de langue / nettoyage / fenêtres + vecteurs
 # ==========================
-nltk.download("punkt", quiet=True)
-nltk.download("stopwords", quiet=True)
+NLP_PROFILES = {
+    "fast": [],  # tri de masse : uniquement ce qu'utilise le matching
+    "standard": ["spacy"],  # + tokens et entités nommées
+    "deep": ["spacy", "sentiment"]  # + sentiment transformer (comportement historique)
+}
+DEFAULT_NLP_PROFILE = os.getenv("NLP_PROFILE", "deep")
+STAGE_RESOURCES = {
+    "spacy": ["spacy_fr", "spacy_en"],
+    "sentiment": ["sentiment_pipeline"]
+}
 
-nlp_fr = spacy.load("fr_core_news_sm")
-nlp_en = spacy.load("en_core_web_sm")
-nlp_fallback = spacy.load("xx_ent_wiki_sm")
 DetectorFactory.seed = 0
 
 # ==========================
 # 🌐 Classe principale
 # ==========================
 class NLPPreprocessor:
-    CHUNK_SIZE = 2000
+    SENTIMENT_MAX_WINDOWS = 8  # Fenêtres analysées au plus pour le sentiment global
 
-    def __init__(self):
+    def __init__(self, warm_up: bool = None):
         self.pplx_key = os.getenv("PERPLEXITY_API_KEY")
         self.has_pplx = bool(self.pplx_key)
 
         if not self.has_pplx:
             print("⚙️ Mode local Hugging Face (aucune clé Perplexity détectée).")
-            self.tokenizer = AutoTokenizer.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
-            self.model = AutoModel.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
-            self.sentiment_analyzer = pipeline(
-                "sentiment-analysis",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest"
-            )
+
+        # Préchargement optionnel en arrière-plan (NLP_WARMUP=true), sinon au premier usage
+        if warm_up is None:
+            warm_up = os.getenv("NLP_WARMUP", "false").lower() == "true"
+        if warm_up:
+            threading.Thread(target=self.warm_up, daemon=True).start()
+
+    # ------------------
+    # 🔹 Modèles (chargement paresseux, partagés par le processus)
+    # ------------------
+    @property
+    def embedder(self):
+        return embedder
+
+    @property
+    def sentiment_analyzer(self):
+        return sentiment_pipeline.get()
+
+    def warm_up(self, profile: str = None):
+        """
+        Charge dès maintenant les modèles du mode actif (limités aux étapes du profil s'il est donné) ;
+        retourne le rapport de démarrage à froid.
+        """
+        if self.has_pplx:
+            return warm_up_resources(PPLX_RESOURCES)
+        if profile is None:
+            return warm_up_resources(LOCAL_RESOURCES)
+        resources = [EMBEDDER_RESOURCE]
+        for stage in self.profile_stages(profile):
+            resources += STAGE_RESOURCES.get(stage, [])
+        return warm_up_resources(resources)
+
+    @staticmethod
+    def profile_stages(profile: str = None):
+        """Étapes optionnelles d'un profil (fast, standard, deep)"""
+        profile = profile or DEFAULT_NLP_PROFILE
+        if profile not in NLP_PROFILES:
+            raise ValueError(f"Profil NLP inconnu : {profile} (attendu : {', '.join(NLP_PROFILES)})")
+        return NLP_PROFILES[profile]
 
     # ------------------
     # 🔹 API Perplexity
@@ -101,7 +193,7 @@ class NLPPreprocessor:
         try:
             return detect(text)
         except:
-            doc = nlp_fallback(text)
+            doc = spacy_models["xx"].get()(text)
             return getattr(doc, "lang_", "unknown")
 
     def clean_text_with_metadata(self, text: str):
@@ -122,50 +214,88 @@ class NLPPreprocessor:
     # ------------------
     # 🔹 Version locale HF (fallback)
     # ------------------
-    def local_nlp_pipeline(self, text: str):
+    def local_nlp_pipeline(self, text: str, profile: str = None):
+        stages = self.profile_stages(profile)
         lang = self.detect_lang(text)
         cleaned, metadata = self.clean_text_with_metadata(text)
-        nlp = nlp_fr if lang == "fr" else nlp_en
-        doc = nlp(cleaned)
-
-        tokens = [t.text for t in doc if not t.is_stop and not t.is_punct]
-        entities = [(ent.text, ent.label_) for ent in doc.ents]
-        sentiment = self.sentiment_analyzer(cleaned[:512])[0]
-        vector = self.vectorize_text(cleaned)
-
-        snippets = []
-        if len(cleaned) > self.CHUNK_SIZE:
-            for i in range(math.ceil(len(cleaned) / self.CHUNK_SIZE)):
-                snippets.append(cleaned[i*self.CHUNK_SIZE:(i+1)*self.CHUNK_SIZE])
-        else:
-            snippets.append(cleaned)
 
-        return {
+        # Fenêtres glissantes alignées sur les phrases (tokenizer du modèle) : tout le texte est couvert
+        document = self.embed_document(text)
+        vector = document["vector"]
+        snippets = [window["text"] for window in document["windows"]] or [cleaned]
+
+        output = {
+            "profile": profile or DEFAULT_NLP_PROFILE,
             "lang": lang,
             "cleaned_text": cleaned,
             "metadata": metadata,
-            "tokens": tokens,
-            "entities": entities,
-            "sentiment": sentiment,
             "vector_shape": vector.shape,
             "vector": vector.tolist(),
-            "snippets": snippets
+            "snippets": snippets,
+            "snippet_vectors": [window["vector"].tolist() for window in document["windows"]]
         }
 
+        # Étapes optionnelles : absentes du résultat si le profil ne les demande pas
+        if "spacy" in stages:
+            output["tokens"], output["entities"] = self.spacy_tokens_entities(text, cleaned, lang)
+        if "sentiment" in stages:
+            output["sentiment"] = self.document_sentiment(snippets)
+        return output
+
+    def spacy_tokens_entities(self, text: str, cleaned: str, lang: str):
+        """Tokens (hors stopwords / ponctuation) et entités nommées selon SPACY_MODE"""
+        nlp = spacy_models["fr" if lang == "fr" else "en"].get()
+        if SPACY_MODE == "full":
+            docs = [nlp(cleaned)]
+        else:
+            # Segments alignés sur les phrases du texte brut, nettoyés un à un :
+            # aucun doc ne dépasse nlp.max_length, et nlp.pipe traite les segments par lots
+            segments = [self.clean_text_with_metadata(seg)[0] for seg in segment_text(text, SPACY_SEGMENT_CHARS)]
+            disabled = [name for name in SPACY_PRUNED_COMPONENTS if name in nlp.pipe_names]
+            docs = nlp.pipe(
+                [seg for seg in segments if seg], batch_size=SPACY_BATCH_SIZE,
+                n_process=SPACY_N_PROCESS, disable=disabled
+            )
+
+        tokens, entities = [], []
+        for doc in docs:
+            tokens.extend(t.text for t in doc if not t.is_stop and not t.is_punct)
+            entities.extend((ent.text, ent.label_) for ent in doc.ents)
+        return tokens, entities
+
     def vectorize_text(self, text: str):
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-        with torch.no_grad():
-            embeddings = self.model(**inputs).last_hidden_state.mean(dim=1).squeeze()
-        return embeddings.numpy()
+        """Vecteur du texte entier (fenêtres glissantes, pas de troncature)"""
+        return embedder.embed_document(text)["vector"]
+
+    def embed_document(self, text: str):
+        """Phrases nettoyées une à une puis fenêtres glissantes : vecteur global + vecteurs par fenêtre"""
+        sentences = [self.clean_text_with_metadata(s)[0] for s in split_sentences(text)]
+        return embedder.embed_document(sentences=[s for s in sentences if s])
+
+    def document_sentiment(self, windows: list):
+        """Sentiment sur des fenêtres entières (au lieu des 512 premiers caractères), label au score cumulé maximal"""
+        windows = windows[:self.SENTIMENT_MAX_WINDOWS]
+        if not windows:
+            return {"label": "neutral", "score": 0.0}
+        results = self.sentiment_analyzer(windows, truncation=True)
+        totals = {}
+        for result in results:
+            totals[result["label"]] = totals.get(result["label"], 0.0) + result["score"]
+        label = max(totals, key=totals.get)
+        return {"label": label, "score": round(totals[label] / len(results), 4), "windows": len(results)}
+
+    def vectorize_texts(self, texts: list, batch_size: int = None):
+        """Vectorise plusieurs textes par lots (matrice n x dim)"""
+        return embedder.encode_batch(texts, batch_size=batch_size)
 
     # ------------------
     # 🔹 Wrapper principal
     # ------------------
-    def nlp_pipeline(self, text: str):
+    def nlp_pipeline(self, text: str, profile: str = None):
         if self.has_pplx:
             return self.perplexity_pipeline(text)
         else:
-            return self.local_nlp_pipeline(text)
+            return self.local_nlp_pipeline(text, profile=profile)
 
     # ------------------
     # 🔹 Parsing Perplexity pour SemanticMatcher
@@ -186,47 +316,26 @@ class NLPPreprocessor:
         Crée des sections utilisables par SemanticMatcher
         """
         parsed = self.parse_perplexity_output(nlp_output)
-        sections = []
 
-        # Résumé
+        # Résumé, recommandations puis texte complet
         summary_text = parsed.get("summary", "")
-        if summary_text.strip():
-            vector = self.vectorize_text(summary_text).tolist()
-            sections.append({
-                "type": "text",
-                "url_source": url,
-                "contenu": summary_text,
-                "nlp": {
-                    "model": nlp_output.get("model"),
-                    "vector": vector
-                }
-            })
-
-        # Recommandations
-        for rec in parsed.get("recommendations", []):
-            if rec.strip():
-                vector = self.vectorize_text(rec).tolist()
-                sections.append({
-                    "type": "text",
-                    "url_source": url,
-                    "contenu": rec,
-                    "nlp": {
-                        "model": nlp_output.get("model"),
-                        "vector": vector
-                    }
-                })
-
-        # Texte complet
+        texts = [summary_text] if summary_text.strip() else []
+        texts += [rec for rec in parsed.get("recommendations", []) if rec.strip()]
         full_text = f"{summary_text} {' '.join(parsed.get('recommendations', []))}".strip()
         if full_text:
-            vector = self.vectorize_text(full_text).tolist()
+            texts.append(full_text)
+
+        # Une seule inférence par lot pour toutes les sections
+        vectors = self.vectorize_texts(texts)
+        sections = []
+        for text, vector in zip(texts, vectors):
             sections.append({
                 "type": "text",
                 "url_source": url,
-                "contenu": full_text,
+                "contenu": text,
                 "nlp": {
                     "model": nlp_output.get("model"),
-                    "vector": vector
+                    "vector": vector.tolist()
                 }
             })
 
@@ -0,0 +1,179 @@
+import os
+import sys
+import importlib.util
+import platform
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.service.data_paths import data_path
+
+# Backend d'inférence des modèles Hugging Face : "torch" (par défaut) ou "onnx" (int8, CPU)
+NLP_BACKEND = os.getenv("NLP_BACKEND", "torch").lower()
+ONNX_MODELS_DIR = os.getenv("ONNX_MODELS_DIR", data_path("onnx_models"))
+ONNX_NUM_THREADS = int(os.getenv("ONNX_NUM_THREADS", "0")) or (os.cpu_count() or 1)
+
+# Dérive maximale tolérée entre vecteurs torch fp32 et ONNX int8
+PARITY_MIN_COSINE = 0.98
+
+
+def onnx_enabled() -> bool:
+    return NLP_BACKEND == "onnx"
+
+
+def _model_dir(model_id: str) -> str:
+    return os.path.join(ONNX_MODELS_DIR, model_id.replace("/", "__") + "-int8")
+
+
+def onnx_ready(model_id: str) -> bool:
+    """Backend ONNX demandé, runtime importable et modèle int8 déjà exporté : utilisable sans chargement préalable."""
+    return (onnx_enabled()
+            and os.path.exists(os.path.join(_model_dir(model_id), "model_quantized.onnx"))
+            and all(importlib.util.find_spec(name) is not None for name in ("onnxruntime", "optimum")))
+
+
+def _session_options():
+    """Threads intra-op réglés pour les nœuds CPU ; un seul thread inter-op (graphe séquentiel)."""
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = ONNX_NUM_THREADS
+    options.inter_op_num_threads = 1
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+
+def export_quantized(model_id: str, model_class) -> str:
+    """
+    Exporte le modèle en ONNX puis applique une quantification dynamique int8 (poids int8,
+    activations quantifiées à la volée). Le résultat est conservé sur disque : export unique.
+    """
+    target = _model_dir(model_id)
+    if os.path.exists(os.path.join(target, "model_quantized.onnx")):
+        return target
+
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    print(f"⚙️ Export ONNX int8 de {model_id}...")
+    export_dir = target + "-fp32"
+    model_class.from_pretrained(model_id, export=True).save_pretrained(export_dir)
+
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        config = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    else:
+        config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    ORTQuantizer.from_pretrained(export_dir).quantize(save_dir=target, quantization_config=config)
+    return target
+
+
+def _load_quantized(model_id: str, model_class):
+    from transformers import AutoTokenizer
+    target = export_quantized(model_id, model_class)
+    model = model_class.from_pretrained(
+        target, file_name="model_quantized.onnx", session_options=_session_options()
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    return model, tokenizer
+
+
+class OnnxSentenceEncoder:
+    """
+    Équivalent ONNX int8 de SentenceTransformer pour les modèles à mean pooling (MiniLM) :
+    même interface encode() / get_sentence_embedding_dimension(), utilisable par EmbeddingService.
+    """
+
+    def __init__(self, model_id: str, max_length: int = 256):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        self.model_id = model_id
+        self.max_length = max_length
+        self.model, self.tokenizer = _load_quantized(model_id, ORTModelForFeatureExtraction)
+        self._dimension = None
+
+    def encode(self, texts, batch_size: int = 32, normalize_embeddings: bool = True,
+               convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            hidden = hidden.numpy() if hasattr(hidden, "numpy") else np.asarray(hidden)
+            # Mean pooling pondéré par le masque d'attention (le padding ne compte pas)
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled.astype(np.float32))
+
+        vectors = np.concatenate(batches) if batches else np.zeros((0, self.get_sentence_embedding_dimension()))
+        if normalize_embeddings:
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors[0] if single else vectors
+
+    @property
+    def max_seq_length(self) -> int:
+        return self.max_length
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = int(self.model.config.hidden_size)
+        return self._dimension
+
+    def __repr__(self):
+        return f"OnnxSentenceEncoder(model_id='{self.model_id}', threads={ONNX_NUM_THREADS})"
+
+
+def load_sentiment_pipeline(model_id: str):
+    """Pipeline transformers "sentiment-analysis" servi par le modèle ONNX int8."""
+    from transformers import pipeline
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    model, tokenizer = _load_quantized(model_id, ORTModelForSequenceClassification)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+def load_with_fallback(name: str, onnx_loader, torch_loader) -> Any:
+    """Charge la variante ONNX si NLP_BACKEND=onnx, et revient à torch en cas d'échec."""
+    if onnx_enabled():
+        try:
+            return onnx_loader()
+        except Exception as e:
+            print(f"⚠️ Backend ONNX indisponible pour {name} ({e}), retour à torch")
+    return torch_loader()
+
+
+# ------------------------------------------------------------
+# 🔬 CONTRÔLE DE PARITÉ TORCH / ONNX
+# ------------------------------------------------------------
+PARITY_TEXTS = [
+    "Nous utilisons des cookies pour mesurer l'audience et personnaliser les publicités.",
+    "Vous pouvez exercer vos droits d'accès, de rectification et d'effacement auprès de notre DPO.",
+    "Les données sont conservées pendant trois ans à compter du dernier contact.",
+    "We share your personal data with third-party advertising partners.",
+    "Mentions légales : éditeur du site, hébergeur et directeur de la publication."
+]
+
+
+def parity_check(model_id: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 texts: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Cosinus entre vecteurs torch fp32 et ONNX int8 sur les mêmes textes (1.0 = identiques)."""
+    from sentence_transformers import SentenceTransformer
+    texts = texts or PARITY_TEXTS
+    reference = SentenceTransformer(model_id).encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+    quantized = OnnxSentenceEncoder(model_id).encode(texts, normalize_embeddings=True)
+    cosines = (reference * quantized).sum(axis=1)
+    return {
+        "model": model_id,
+        "texts": len(texts),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "min_cosine": round(float(cosines.min()), 5),
+        "max_drift": round(float(1 - cosines.min()), 5),
+        "within_tolerance": bool(cosines.min() >= PARITY_MIN_COSINE)
+    }
+
+
+if __name__ == "__main__":
+    # python -m app.service.onnx_backend [model_id]
+    report = parity_check(*sys.argv[1:2])
+    print(report)
+    sys.exit(0 if report["within_tolerance"] else 1)
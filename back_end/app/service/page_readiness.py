@@ -0,0 +1,102 @@
+import time
+from typing import Dict, Any
+
+from app.service.browser_profile import execute_cdp
+
+# Sonde injectée dans la page : requêtes fetch/XHR en cours + dernière mutation DOM
+PROBE_JS = """
+(function () {
+  if (window.__psciProbe) { return; }
+  var probe = { inflight: 0, lastActivity: performance.now() };
+  window.__psciProbe = probe;
+  function touch() { probe.lastActivity = performance.now(); }
+
+  try {
+    new MutationObserver(touch).observe(document, {
+      childList: true, subtree: true, attributes: true, characterData: true
+    });
+  } catch (e) {}
+
+  if (window.fetch) {
+    var origFetch = window.fetch;
+    window.fetch = function () {
+      probe.inflight++; touch();
+      return origFetch.apply(this, arguments).finally(function () { probe.inflight--; touch(); });
+    };
+  }
+
+  var origSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    probe.inflight++; touch();
+    this.addEventListener('loadend', function () { probe.inflight--; touch(); });
+    return origSend.apply(this, arguments);
+  };
+})();
+"""
+
+STATE_JS = """
+var probe = window.__psciProbe || {};
+return {
+  readyState: document.readyState,
+  now: performance.now(),
+  inflight: probe.inflight || 0,
+  lastActivity: probe.lastActivity || 0,
+  resources: performance.getEntriesByType('resource').length
+};
+"""
+
+
+def install_probe(driver) -> bool:
+    """
+    Installe la sonde avant les scripts de la page (CDP) pour toutes les navigations
+    suivantes de la session. Retourne False si CDP n'est pas disponible.
+    """
+    if getattr(driver, "_psci_probe_installed", False):
+        return True
+    ok = execute_cdp(driver, "Page.addScriptToEvaluateOnNewDocument", {"source": PROBE_JS})
+    if ok:
+        driver._psci_probe_installed = True
+    return ok
+
+
+def wait_for_page_ready(driver, max_wait: float = 15, quiet_period: float = 0.5,
+                        poll_interval: float = 0.1) -> Dict[str, Any]:
+    """
+    Attend que la page soit prête au lieu d'un time.sleep fixe :
+    - document.readyState == "complete"
+    - plus aucune requête fetch/XHR en cours, ni nouvelle ressource chargée
+    - aucune mutation DOM depuis `quiet_period` secondes
+    S'arrête dans tous les cas après `max_wait` secondes.
+    Retourne {"ready": bool, "elapsed": float}.
+    """
+    start = time.monotonic()
+    deadline = start + max_wait
+
+    # Sans CDP, la sonde est injectée après coup (requêtes déjà parties non suivies)
+    if not getattr(driver, "_psci_probe_installed", False):
+        try:
+            driver.execute_script(PROBE_JS)
+        except Exception:
+            pass
+
+    last_resources = -1
+    while True:
+        now = time.monotonic()
+        try:
+            state = driver.execute_script(STATE_JS) or {}
+        except Exception:
+            state = {}
+
+        # Le nombre de ressources doit être stable entre deux sondages consécutifs
+        resources = state.get("resources", 0)
+        idle_ms = state.get("now", 0) - state.get("lastActivity", 0)
+        if (state.get("readyState") == "complete"
+                and state.get("inflight", 0) <= 0
+                and resources == last_resources
+                and idle_ms >= quiet_period * 1000):
+            return {"ready": True, "elapsed": round(now - start, 3)}
+        last_resources = resources
+
+        if now >= deadline:
+            return {"ready": False, "elapsed": round(now - start, 3)}
+        time.sleep(min(poll_interval, max(0.0, deadline - now)))
@@ -1,6 +1,7 @@
 import json
-import torch
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+
+from app.service.embedding_service import get_embedding_service, DEFAULT_EMBEDDING_MODEL
 
 
 class SemanticMatcher:
@@ -10,7 +11,7 @@ class SemanticMatcher:
     Retourne un dict prêt pour PromptGenerator ou stockage en base.
     """
 
-    def __init__(self, rgpd_data: list, site_data: list, embedding_model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, rgpd_data: list, site_data: list, embedding_model_name: str = DEFAULT_EMBEDDING_MODEL):
 
         if rgpd_data is None:
             raise ValueError("Il faut passer les embeddings RGPD déjà chargés en mémoire")
@@ -28,15 +29,16 @@ class SemanticMatcher:
             else:
                 raise ValueError("Format inattendu : aucune liste de pages trouvée.")
 
-        # --- Modèle pour générer les vecteurs ---
-        self.embedding_model = SentenceTransformer(embedding_model_name)
+        # --- Service d'embeddings partagé (aucun chargement à la construction) ---
+        self.embedding_model = get_embedding_service(embedding_model_name)
 
     @staticmethod
     def cosine_similarity(vec1, vec2):
         """Retourne la similarité cosinus entre deux vecteurs."""
-        t1 = torch.tensor(vec1)
-        t2 = torch.tensor(vec2)
-        return util.cos_sim(t1, t2).item()
+        v1 = np.asarray(vec1, dtype=np.float32)
+        v2 = np.asarray(vec2, dtype=np.float32)
+        norm = np.linalg.norm(v1) * np.linalg.norm(v2)
+        return float(np.dot(v1, v2) / norm) if norm else 0.0
 
     def match_section(self, dynamic_vector, threshold=0.75, top_k=3):
         """Renvoie les matches RGPD au-dessus du seuil, triés par score."""
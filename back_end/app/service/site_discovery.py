@@ -0,0 +1,111 @@
+import gzip
+from typing import Iterator, List, Optional
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import iterparse, ParseError
+
+import requests
+
+# Agent déclaré pour l'interprétation de robots.txt (règles "User-agent: *" sinon)
+ROBOTS_USER_AGENT = "PSCI-Audit"
+
+MAX_SITEMAP_URLS = 500  # URLs de pages retenues au plus, tous sitemaps confondus
+MAX_SITEMAPS = 20  # Fichiers sitemap (index compris) lus au plus
+MAX_INDEX_DEPTH = 2  # Profondeur d'imbrication des sitemap index
+
+
+def _local_name(tag: str) -> str:
+    """'{http://www.sitemaps.org/schemas/sitemap/0.9}loc' -> 'loc'"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def fetch_robots(http, url: str, timeout: float = 5) -> RobotFileParser:
+    """
+    Lit le robots.txt de l'hôte de `url`.
+    Absent (4xx) : tout est autorisé ; inaccessible (5xx, réseau) : tout est autorisé aussi,
+    l'audit ne doit pas s'arrêter pour un robots.txt en panne.
+    """
+    parts = urlparse(url)
+    robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+    parser = RobotFileParser(robots_url)
+    try:
+        response = http.get(robots_url, timeout=timeout)
+    except requests.RequestException:
+        response = None
+
+    if response is not None and response.status_code == 200:
+        parser.parse(response.text.splitlines())
+    else:
+        parser.parse([])
+    return parser
+
+
+def robots_sitemaps(robots: Optional[RobotFileParser], url: str) -> List[str]:
+    """Sitemaps déclarés dans robots.txt, sinon /sitemap.xml par défaut."""
+    declared = (robots.site_maps() if robots else None) or []
+    if declared:
+        return declared
+    parts = urlparse(url)
+    return [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+
+
+def iter_sitemap_urls(http, sitemap_urls: List[str], max_urls: int = MAX_SITEMAP_URLS,
+                      max_sitemaps: int = MAX_SITEMAPS, timeout: float = 10) -> Iterator[str]:
+    """
+    Parcourt les sitemaps (urlset, sitemap index, .xml.gz) en flux avec iterparse :
+    chaque <loc> est produit dès qu'il est lu et l'arbre XML est vidé au fur et à mesure,
+    la mémoire reste bornée même pour des sitemaps de plusieurs dizaines de Mo.
+    """
+    queue = [(url, 0) for url in sitemap_urls]
+    seen = set()
+    produced = 0
+
+    while queue and len(seen) < max_sitemaps:
+        sitemap_url, index_depth = queue.pop(0)
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+
+        for kind, loc in _parse_sitemap(http, sitemap_url, timeout):
+            if kind == "sitemap":
+                if index_depth < MAX_INDEX_DEPTH:
+                    queue.append((urljoin(sitemap_url, loc), index_depth + 1))
+                continue
+            yield urljoin(sitemap_url, loc)
+            produced += 1
+            if produced >= max_urls:
+                return
+
+
+def _parse_sitemap(http, sitemap_url: str, timeout: float) -> Iterator[tuple]:
+    """Produit ("url" | "sitemap", loc) pour chaque entrée d'un fichier sitemap."""
+    try:
+        response = http.get(sitemap_url, timeout=timeout, use_cache=False, stream=True)
+        if response.status_code != 200:
+            response.close()
+            return
+    except requests.RequestException:
+        print(f"Sitemap inaccessible : {sitemap_url}")
+        return
+
+    stream = response.raw
+    stream.decode_content = True  # Content-Encoding: gzip géré par urllib3
+    if sitemap_url.lower().endswith(".gz"):
+        stream = gzip.GzipFile(fileobj=stream)
+
+    root = None
+    try:
+        for event, element in iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                continue
+            name = _local_name(element.tag)
+            if name == "loc" and element.text:
+                yield ("sitemap" if _local_name(root.tag) == "sitemapindex" else "url"), element.text.strip()
+            elif name in ("url", "sitemap"):
+                root.clear()  # Entrée traitée : rien n'est conservé en mémoire
+    except (ParseError, OSError, EOFError) as e:
+        print(f"Sitemap illisible {sitemap_url} : {e}")
+    finally:
+        response.close()
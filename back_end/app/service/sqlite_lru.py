@@ -0,0 +1,62 @@
+import time
+import sqlite3
+from typing import Dict, Optional
+
+
+class SqliteLru:
+    """
+    Politique LRU d'une table SQLite servant de cache (HttpCache, EmbeddingCache) :
+    - dates d'accès gardées en mémoire et écrites par lot (colonne `accessed_at`),
+      au plus toutes les `flush_interval` secondes : une lecture ne déclenche pas d'écriture disque
+    - éviction des entrées les moins récemment utilisées dès que la taille totale dépasse `max_bytes`
+    Aucun verrou ni commit ici : l'appelant tient son propre verrou et valide sa transaction.
+    """
+
+    def __init__(self, table: str, key_column: str, size_expr: str, max_bytes: int,
+                 flush_interval: float = 30):
+        self.table = table
+        self.key_column = key_column
+        self.size_expr = size_expr  # Colonne ou expression SQL donnant la taille d'une entrée
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, float] = {}
+        self._last_flush = time.monotonic()
+
+    def touch(self, key: str, accessed_at: Optional[float] = None):
+        """Note un accès (écrit au prochain flush)."""
+        self._pending[key] = time.time() if accessed_at is None else accessed_at
+
+    def forget(self, key: Optional[str] = None):
+        """Abandonne l'accès en attente d'une clé (toutes si None), déjà écrit ou supprimé par l'appelant."""
+        if key is None:
+            self._pending.clear()
+        else:
+            self._pending.pop(key, None)
+
+    def flush_due(self) -> bool:
+        return bool(self._pending) and time.monotonic() - self._last_flush >= self.flush_interval
+
+    def flush(self, conn: sqlite3.Connection):
+        """Écrit en un lot les dates d'accès en attente."""
+        if self._pending:
+            conn.executemany(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE {self.key_column} = ?",
+                [(accessed_at, key) for key, accessed_at in self._pending.items()]
+            )
+            self._pending.clear()
+        self._last_flush = time.monotonic()
+
+    def evict(self, conn: sqlite3.Connection):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes."""
+        self.flush(conn)
+        total = conn.execute(f"SELECT COALESCE(SUM({self.size_expr}), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in conn.execute(
+                f"SELECT {self.key_column}, {self.size_expr} FROM {self.table} ORDER BY accessed_at ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size or 0
+        conn.executemany(f"DELETE FROM {self.table} WHERE {self.key_column} = ?", stale)
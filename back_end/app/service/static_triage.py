@@ -0,0 +1,75 @@
+from typing import Any, Dict, Optional
+
+from bs4 import BeautifulSoup, Comment
+
+from app.service.keyword_matcher import get_keyword_matcher
+
+# Marqueurs dans le HTML serveur indiquant que le contenu est construit en JavaScript
+JS_FRAMEWORK_MARKERS = {
+    "react": ["data-reactroot", "__next_data__", "/_next/static/"],
+    "vue": ["__nuxt__", "data-v-app", "/_nuxt/"],
+    "angular": ["ng-version", "ng-app", "<app-root"],
+    "svelte": ["__sveltekit", "data-sveltekit"]
+}
+
+# Page qui demande explicitement JavaScript
+NOSCRIPT_MARKERS = {"noscript": ["enable javascript", "activer javascript", "activez javascript"]}
+
+# Bandeaux cookies injectés par un CMP : invisibles sans exécuter les scripts
+CONSENT_MANAGER_MARKERS = {
+    "cmp": [
+        "onetrust", "cookielaw.org", "cookiebot", "didomi", "axeptio", "tarteaucitron",
+        "quantcast", "usercentrics", "trustarc", "sirdata", "iubenda", "cookieyes",
+        "complianz", "consentmanager", "sfbx", "klaro"
+    ]
+}
+
+# Conteneurs racine des SPA (vides dans le HTML serveur)
+SPA_ROOT_IDS = ["root", "app", "__next", "__nuxt", "svelte"]
+
+MIN_TEXT_LENGTH = 200
+
+_NON_TEXT_TAGS = {"script", "style", "noscript", "template", "head", "title"}
+
+
+def triage_static_html(html: Optional[str], soup: Optional[BeautifulSoup] = None) -> Dict[str, Any]:
+    """
+    Décide à partir du HTML serveur si le rendu navigateur (Selenium) est nécessaire.
+    Un framework JS seul ne suffit pas (rendu serveur possible) : il faut aussi un contenu
+    absent ou trop maigre, ou un CMP dont le bandeau n'existe qu'après exécution des scripts.
+    Retourne {"needs_dynamic": bool, "reasons": [...], "frameworks": [...]}.
+    """
+    if not html:
+        return {"needs_dynamic": True, "reasons": ["no_static_html"], "frameworks": []}
+
+    soup = soup or BeautifulSoup(html, "html.parser")
+    reasons = []
+
+    # Un seul passage sur le HTML pour tous les marqueurs
+    hits = get_keyword_matcher({**JS_FRAMEWORK_MARKERS, **NOSCRIPT_MARKERS, **CONSENT_MANAGER_MARKERS}).scan(html)
+    frameworks = [name for name in JS_FRAMEWORK_MARKERS if name in hits]
+
+    if "noscript" in hits:
+        reasons.append("javascript_required")
+
+    if "cmp" in hits:
+        reasons.append("consent_manager_script")
+
+    for root_id in SPA_ROOT_IDS:
+        root = soup.find(id=root_id)
+        if root is not None and not root.get_text(strip=True):
+            reasons.append(f"empty_root:#{root_id}")
+
+    mains = soup.find_all("main")
+    if mains and not any(m.get_text(strip=True) for m in mains):
+        reasons.append("empty_main")
+
+    body = soup.body or soup
+    text_length = sum(
+        len(s.strip()) for s in body.find_all(string=True)
+        if not isinstance(s, Comment) and s.parent.name not in _NON_TEXT_TAGS
+    )
+    if text_length < MIN_TEXT_LENGTH:
+        reasons.append("too_little_text")
+
+    return {"needs_dynamic": bool(reasons), "reasons": reasons, "frameworks": frameworks}
@@ -0,0 +1,94 @@
+import re
+from typing import List
+
+# Fin de phrase : ponctuation forte suivie d'un blanc, ou saut de ligne (listes, titres)
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;:])\s+|\s*\n+\s*")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Découpe un texte brut (avant nettoyage) en phrases non vides."""
+    return [s.strip() for s in _SENTENCE_BOUNDARY.split(text or "") if s and s.strip()]
+
+
+def _hard_split(sentence: str, max_chars: int) -> List[str]:
+    """Phrase plus longue que max_chars : coupée sur les espaces, un mot plus long que max_chars (URL, base64...) tranché."""
+    words = []
+    for word in sentence.split():
+        words.extend(word[start:start + max_chars] for start in range(0, len(word), max_chars))
+
+    parts, current = [], ""
+    for word in words:
+        if current and len(current) + 1 + len(word) > max_chars:
+            parts.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def pack_sentences(sentences: List[str], max_chars: int) -> List[str]:
+    """Regroupe des phrases consécutives en segments d'au plus max_chars (sans couper une phrase)."""
+    segments, current = [], ""
+    for sentence in sentences:
+        pieces = _hard_split(sentence, max_chars) if len(sentence) > max_chars else [sentence]
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > max_chars:
+                segments.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        segments.append(current)
+    return segments
+
+
+def segment_text(text: str, max_chars: int = 1000) -> List[str]:
+    """Segments alignés sur les phrases, de taille bornée (traitements par lot)."""
+    return pack_sentences(split_sentences(text), max_chars)
+
+
+def token_windows(sentences: List[str], tokenizer, max_tokens: int, overlap_tokens: int = 32) -> List[str]:
+    """
+    Fenêtres glissantes mesurées avec le tokenizer du modèle :
+    chaque fenêtre contient des phrases entières et au plus `max_tokens` tokens,
+    la suivante reprend les dernières phrases de la précédente (jusqu'à `overlap_tokens` tokens).
+    Une phrase trop longue pour une fenêtre est découpée selon les offsets des tokens.
+    """
+    sentences = [s for s in sentences if s and s.strip()]
+    if not sentences:
+        return []
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+
+    # Unités de base : (texte, nombre de tokens), phrases trop longues découpées
+    units = []
+    encoded = tokenizer(sentences, add_special_tokens=False, return_offsets_mapping=True)
+    for sentence, ids, offsets in zip(sentences, encoded["input_ids"], encoded["offset_mapping"]):
+        if len(ids) <= max_tokens:
+            units.append((sentence, len(ids)))
+            continue
+        step = max_tokens - overlap_tokens
+        for start in range(0, len(ids), step):
+            span = offsets[start:start + max_tokens]
+            units.append((sentence[span[0][0]:span[-1][1]], len(span)))
+            if start + max_tokens >= len(ids):
+                break
+
+    windows, current, current_tokens = [], [], 0
+    for unit in units:
+        if current and current_tokens + unit[1] > max_tokens:
+            windows.append(" ".join(text for text, _ in current))
+            # Recouvrement : dernières unités de la fenêtre précédente
+            carried, carried_tokens = [], 0
+            for previous in reversed(current):
+                if carried_tokens + previous[1] > overlap_tokens or carried_tokens + previous[1] + unit[1] > max_tokens:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous[1]
+            current, current_tokens = carried, carried_tokens
+        current.append(unit)
+        current_tokens += unit[1]
+    if current:
+        windows.append(" ".join(text for text, _ in current))
+    return windows
@@ -0,0 +1,73 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Forme normalisée d'une URL pour les clés de cache :
+    schéma et hôte en minuscules, port par défaut retiré, fragment supprimé, paramètres triés.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+# Suffixes publics à deux niveaux les plus courants (sans dépendance à la Public Suffix List)
+MULTI_LABEL_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "com.au", "net.au", "org.au", "co.nz",
+    "co.jp", "ne.jp", "com.br", "com.cn", "com.mx", "co.za", "co.in", "com.tr", "com.es",
+    "gouv.fr", "asso.fr", "nom.fr", "com.fr", "tm.fr", "gov.fr", "co.it", "com.be", "com.pl",
+    "qc.ca", "gc.ca", "co.il", "com.sg", "com.hk", "co.kr"
+}
+
+
+def registrable_domain(host: str) -> str:
+    """Domaine enregistrable approximatif : 'www.shop.example.co.uk' -> 'example.co.uk'."""
+    host = (host or "").lower().strip(".")
+    labels = host.split(".")
+    if len(labels) <= 2 or host.replace(".", "").isdigit() or ":" in host:
+        return host
+    if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+# Paramètres de suivi marketing sans effet sur le contenu (pas "ref" : souvent une vraie référence produit)
+TRACKING_PARAMS = {
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "ref_src", "srsltid"
+}
+DEFAULT_DOCUMENTS = ("index.html", "index.htm", "index.php", "default.aspx")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    URL canonique à crawler : normalize_url + paramètres de suivi (utm_*, gclid...) retirés,
+    document par défaut (index.html) et slash final supprimés.
+    """
+    parts = urlsplit(normalize_url(url))
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ])
+    path = parts.path
+    for document in DEFAULT_DOCUMENTS:
+        if path.lower().endswith("/" + document):
+            path = path[:-len(document)]
+            break
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme, parts.netloc, path, query, ""))
+
+
+def url_key(url: str) -> str:
+    """Clé de déduplication : URL canonique sans schéma ni 'www.' (http/https et www fusionnés)."""
+    parts = urlsplit(canonicalize_url(url))
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return urlunsplit(("", host, parts.path, parts.query, "")).lstrip("/")
@@ -1,92 +1,460 @@
 from app.service.content_scraper import ContentScraper
 from app.service.extract_ssl import ExtractSSL
+from app.service.crawl_frontier import CrawlFrontier
+from app.service.url_utils import registrable_domain, canonicalize_url, url_key
+from app.service.content_fingerprint import simhash, SimHashIndex
+from app.service.dom_snapshot import visible_soup, element_text
+from app.service.link_scorer import score_link, url_categories, link_region, GDPR_LINK_CATEGORIES
+from app.service.keyword_matcher import get_keyword_matcher
+from app.service.crawl_checkpoint import CrawlCheckpoint
+from app.service.site_discovery import (
+    fetch_robots, robots_sitemaps, iter_sitemap_urls, ROBOTS_USER_AGENT, MAX_SITEMAP_URLS
+)
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import threading
+import queue
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 import time
 import json
 
 class WebCrawler:
+    # Catégories de preuves RGPD dont la couverture arrête le crawl
+    REQUIRED_CATEGORIES = ("confidentialite", "cookies", "mentions")
+    # Priorité de la page de départ : visitée avant les pages RGPD des sitemaps (bandeau cookie, formulaires)
+    START_PRIORITY = 1e9
 
-    def __init__(self, start_url, max_depth=2, delay=1):
-        self.start_url = start_url
+    def __init__(self, start_url, max_depth=2, delay=0.25, workers=4, max_pages=50, max_seconds=None,
+                 required_categories=REQUIRED_CATEGORIES, stop_when_covered=True,
+                 checkpoint=None, checkpoint_interval=30, crawl_id=None,
+                 use_robots=True, use_sitemaps=True, max_sitemap_urls=MAX_SITEMAP_URLS):
+        if not start_url.startswith(("http://", "https://")):
+            start_url = "https://" + start_url
+        self.start_url = canonicalize_url(start_url)
         self.max_depth = max_depth
-        self.delay = delay
-        self.visited = set()
-        self.ssl_objects = []  # Liste pour stocker les instances ExtractSSL
+        self.delay = delay  # Intervalle minimal entre deux requêtes vers le même hôte (Crawl-delay s'il est plus grand)
+        self.workers = workers
+        self.max_pages = max_pages  # Budget en nombre de pages (None = illimité)
+        self.max_seconds = max_seconds  # Budget en temps (None = illimité)
+        self.required_categories = set(required_categories or ())
+        self.stop_when_covered = stop_when_covered
+        self.covered_categories = set()  # Catégories RGPD attestées par les pages déjà visitées
+        self.link_categories = {}  # url_key -> catégories annoncées par les liens entrants
+        self.ssl_by_host = {}  # hostname -> infos du certificat (un sondage par hôte, par lot)
+        self.domain = registrable_domain(urlparse(start_url).hostname or "")
+        self.visited = set()  # URLs canoniques
+        self.fingerprints = SimHashIndex(max_distance=3)  # Empreintes du texte des pages
+        self.duplicates = {}  # URL quasi-doublon -> URL de la page déjà vue
         self.scraper = ContentScraper()  # Instance du scraper
+        self.http = self.scraper.http  # Client HTTP partagé (keep-alive + cache disque)
+        self.use_robots = use_robots  # Respect de robots.txt (Disallow, Crawl-delay)
+        self.use_sitemaps = use_sitemaps  # Amorçage de la frontière par sitemap.xml
+        self.max_sitemap_urls = max_sitemap_urls
+        self.robots = None  # RobotFileParser de l'hôte de départ
+        self.checkpoint = checkpoint  # CrawlCheckpoint (None = pas de reprise possible)
+        self.checkpoint_interval = checkpoint_interval  # Secondes entre deux checkpoints
+        self.crawl_id = crawl_id or self.start_url
+        self.scraped = set()  # Pages dont le résultat de scraping est sauvegardé
+        self._resume_frontier = None  # État de frontière rechargé par load_checkpoint()
+        self._last_checkpoint = time.monotonic()
+        self._root_visited = False  # Page de départ visitée : condition de l'arrêt sur couverture
+        self._lock = threading.Lock()
+        self._ssl_lock = threading.Lock()  # Un seul lot de sondages SSL à la fois (pas de double handshake)
+        self._stop = threading.Event()
 
-    def crawl(self, url=None, depth=1):
-        """Fonction récursive pour parcourir les pages du site"""
+    @classmethod
+    def resume(cls, start_url, checkpoint=None, **kwargs):
+        """Reprend un crawl interrompu à partir de son dernier checkpoint (ou le démarre s'il n'y en a pas)"""
+        crawler = cls(start_url, checkpoint=checkpoint or CrawlCheckpoint(), **kwargs)
+        crawler.load_checkpoint()
+        return crawler
+
+    def in_scope(self, url):
+        """Vrai si l'URL appartient au même domaine enregistrable que start_url"""
+        return registrable_domain(urlparse(url).hostname or "") == self.domain
+
+    def crawlable_url(self, url, base=None):
+        """
+        URL canonique (résolue par rapport à `base`) si la page est à crawler (http(s), même site) ;
+        None sinon, ou si l'URL est mal formée (port invalide, IPv6 incorrecte...) : le lien est ignoré
+        """
+        try:
+            url = urljoin(base, url) if base else url
+            if not url.startswith(("http://", "https://")) or not self.in_scope(url):
+                return None
+            return canonicalize_url(url)
+        except ValueError:
+            print(f"Malformed URL skipped: {url}")
+            return None
+
+    def allowed(self, url):
+        """Vrai si robots.txt autorise la page (règles de l'hôte de départ)"""
+        if self.robots is None or urlparse(url).netloc != urlparse(self.start_url).netloc:
+            return True
+        return self.robots.can_fetch(ROBOTS_USER_AGENT, url)
+
+    def load_robots(self):
+        """Lit robots.txt : règles d'exclusion et Crawl-delay (remplace le délai par défaut s'il est plus long)"""
+        self.robots = fetch_robots(self.http, self.start_url)
+        crawl_delay = self.robots.crawl_delay(ROBOTS_USER_AGENT)
+        if crawl_delay:
+            self.delay = max(self.delay, float(crawl_delay))
+            print(f"Crawl-delay: {self.delay}s")
+        return self.robots
+
+    def seed_from_sitemaps(self, frontier, depth):
+        """Ajoute à la frontière les pages listées dans les sitemaps, pages RGPD en tête"""
+        sitemaps = robots_sitemaps(self.robots, self.start_url)
+        seeded = 0
+        for page_url in iter_sitemap_urls(self.http, sitemaps, max_urls=self.max_sitemap_urls):
+            page_url = self.crawlable_url(page_url)
+            if not page_url:
+                continue
+            score, categories = score_link(page_url)
+            if categories:
+                with self._lock:
+                    self.link_categories.setdefault(url_key(page_url), set()).update(categories)
+            if frontier.push(page_url, depth, score):
+                seeded += 1
+        print(f"Sitemap: {seeded} pages added to the frontier")
+        return seeded
+
+    def crawl(self, url=None, depth=1, on_page=None):
+        """
+        Parcours itératif du site servi par un pool de workers : liens RGPD en priorité,
+        arrêt au budget de pages/temps ou dès que les catégories requises sont couvertes.
+        `on_page(url)` est appelé pour chaque page visitée à scraper (hors quasi-doublons).
+        """
         if url is None:
             url = self.start_url
 
-        if url in self.visited or depth > self.max_depth:
-            return
+        if self.use_robots and self.robots is None:
+            self.load_robots()
+
+        root = canonicalize_url(url)
+        with self._lock:
+            # Après une reprise, visited ne contient que les pages entièrement traitées
+            self._root_visited = root in self.visited
 
-        self.visited.add(url)
+        frontier = CrawlFrontier(delay=self.delay, key=url_key)
+        if self._resume_frontier is not None:
+            frontier.restore(self._resume_frontier)
+            self._resume_frontier = None
+        elif depth <= self.max_depth:
+            frontier.push(root, depth, self.START_PRIORITY)
+            # 🔹 Pages des sitemaps : considérées comme liées depuis la page de départ
+            if self.use_sitemaps and depth + 1 <= self.max_depth:
+                self.seed_from_sitemaps(frontier, depth + 1)
+        deadline = time.monotonic() + self.max_seconds if self.max_seconds else None
+        # 🔹 Certificats des hôtes déjà connus (départ, sitemaps, reprise) en un seul lot
+        self.probe_ssl([url] + [entry[0] for entry in frontier.snapshot()["entries"]])
+
+        def worker():
+            while True:
+                item = frontier.pop()
+                if item is None:
+                    return
+                page_url, page_depth = item
+                processed = True
+                try:
+                    # 🔹 Budgets temps / pages, arrêt demandé par le consommateur
+                    # (l'URL non traitée reste dans le checkpoint)
+                    if self._stop.is_set() or (deadline and time.monotonic() > deadline):
+                        processed = False
+                        frontier.close()
+                        continue
+                    if not self.allowed(page_url):
+                        print(f"Disallowed by robots.txt: {page_url}")
+                        continue
+                    with self._lock:
+                        if page_url in self.visited:
+                            continue
+                        if self.max_pages and len(self.visited) >= self.max_pages:
+                            processed = False
+                            frontier.close()
+                            continue
+                        self.visited.add(page_url)
+
+                    links, categories = self.visit_page(page_url)
+                    if on_page and page_url not in self.duplicates:
+                        on_page(page_url)
+                    if page_url == root:
+                        with self._lock:
+                            self._root_visited = True
+                    if self.mark_covered(page_url, categories or ()):
+                        frontier.close()
+                        continue
+
+                    if page_depth + 1 <= self.max_depth:
+                        for next_url, priority in links:
+                            frontier.push(next_url, page_depth + 1, priority)
+                finally:
+                    frontier.task_done(page_url if processed else None)
+                    self.save_checkpoint(frontier)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(lambda _: worker(), range(self.workers)))
+        self.save_checkpoint(frontier, force=True)
+
+    def visit_page(self, url):
+        """
+        Extraction SSL + requête HTTP d'une page ; retourne (liens à suivre [(url, priorité)], catégories RGPD
+        présentes dans le contenu de la page). Catégories None si la page est inaccessible, pas du HTML ou un quasi-doublon.
+        """
         print(f"Crawling: {url}")
 
-        # 🔹 Extraction SSL pour cette page
-        ssl_obj = ExtractSSL(url)
-        self.ssl_objects.append(ssl_obj)
-        print(f"SSL info: {ssl_obj.info.get('common_name', 'N/A')}")
+        # 🔹 Certificat SSL de l'hôte (déjà sondé, sauf hôte apparu en cours de crawl)
+        self.probe_ssl([url])
+        print(f"SSL info: {self.get_ssl_for(url).get('common_name', 'N/A')}")
 
         # 🔹 Requête HTTP pour scraping statique
         try:
-            response = requests.get(url, timeout=5)
+            response = self.http.get(url, timeout=5)
             response.raise_for_status()
         except requests.RequestException:
             print(f"Failed to access {url}")
-            return
+            return [], None
+        if "html" not in response.headers.get("Content-Type", "text/html").lower():
+            print(f"Not an HTML page: {url}")
+            return [], None
 
         soup = BeautifulSoup(response.text, 'html.parser')
 
-        # 🔹 Parcours des liens pour continuer le crawl
+        # 🔹 Quasi-doublons (même gabarit / même contenu) : crawlés mais non scrapés
+        page = visible_soup(response.text)
+        duplicate = self.check_duplicate(url, page)
+        content_categories = None if duplicate else self.page_categories(page)
+
+        # 🔹 Liens à ajouter à la frontière, notés selon ancre, chemin et position (footer, nav...)
+        links = []
         for link in soup.find_all('a', href=True):
-            next_url = link['href']
-            full_url = urljoin(url, next_url)
-            if full_url.startswith(("http://", "https://")):
-                if full_url not in self.visited:
-                    self.crawl(full_url, depth + 1)
+            full_url = self.crawlable_url(link['href'], base=url)
+            if full_url:
+                score, categories = score_link(full_url, link.get_text(" ", strip=True), link_region(link))
+                if categories:
+                    with self._lock:
+                        self.link_categories.setdefault(url_key(full_url), set()).update(categories)
+                links.append((full_url, score))
+
+        # 🔹 Nouveaux hôtes du site (sous-domaines) sondés en un lot avant leur visite
+        self.probe_ssl(link for link, _ in links)
+        return links, content_categories
+
+    def probe_ssl(self, urls):
+        """Sonde en parallèle les certificats des hôtes pas encore connus (un handshake par hostname)"""
+        with self._ssl_lock:
+            with self._lock:
+                known = set(self.ssl_by_host)
+            hosts = {urlparse(u).hostname for u in urls} - known - {None}
+            if not hosts:
+                return
+            infos = ExtractSSL.probe_many(f"https://{host}" for host in sorted(hosts))
+            with self._lock:
+                self.ssl_by_host.update(infos)
 
-        time.sleep(self.delay)
+    @staticmethod
+    def page_text(page):
+        """Texte principal d'une page (balises <main>, sinon <body>)"""
+        mains = page.find_all("main")
+        return "\n".join(element_text(m) for m in mains) if mains else element_text(page.body or page)
+
+    def page_categories(self, page):
+        """Catégories RGPD citées dans le contenu de la page, hors menus et pied de page (liens présents sur tout le site)"""
+        for el in page.find_all(["nav", "header", "footer"]):
+            if not el.decomposed:
+                el.decompose()
+        return set(get_keyword_matcher(GDPR_LINK_CATEGORIES).scan(self.page_text(page)))
+
+    def mark_covered(self, url, page_categories):
+        """
+        Ajoute les catégories annoncées pour la page (chemin, ancres des liens entrants) et confirmées par son contenu ;
+        True si toutes les catégories requises sont couvertes et la page de départ déjà visitée (transmise au scraping)
+        """
+        with self._lock:
+            announced = url_categories(url) | self.link_categories.get(url_key(url), set())
+            self.covered_categories |= announced & set(page_categories)
+            return bool(self.stop_when_covered and self.required_categories and self._root_visited
+                        and self.required_categories <= self.covered_categories)
+
+    def check_duplicate(self, url, page):
+        """Empreinte SimHash du texte principal (page déjà passée par visible_soup) ; retourne l'URL originale si la page est un quasi-doublon"""
+        text = self.page_text(page)
+        if not text.strip():
+            return None
+        original = self.fingerprints.find_or_add(simhash(text), url)
+        if original:
+            with self._lock:
+                self.duplicates[url] = original
+            print(f"Duplicate of {original}: {url}")
+        return original
+
+    # ------------------------------------------------------------
+    # 💾 CHECKPOINTS / REPRISE
+    # ------------------------------------------------------------
+    def export_state(self, frontier):
+        """État sérialisable du crawl ; les pages en cours de visite restent dans la frontière"""
+        frontier_state = frontier.snapshot()
+        in_progress = {entry[0] for entry in frontier_state["entries"]}
+        with self._lock:
+            return {
+                "frontier": frontier_state,
+                "visited": sorted(self.visited - in_progress),
+                "duplicates": dict(self.duplicates),
+                "fingerprints": self.fingerprints.items(),
+                "covered_categories": sorted(self.covered_categories),
+                "link_categories": {key: sorted(cats) for key, cats in self.link_categories.items()},
+                "ssl_by_host": dict(self.ssl_by_host)
+            }
+
+    def save_checkpoint(self, frontier, force=False):
+        """Sauvegarde l'état du crawl au plus toutes les `checkpoint_interval` secondes (ou immédiatement si force)"""
+        if self.checkpoint is None:
+            return
+        with self._lock:
+            if not force and time.monotonic() - self._last_checkpoint < self.checkpoint_interval:
+                return
+            self._last_checkpoint = time.monotonic()
+        try:
+            self.checkpoint.save_state(self.crawl_id, self.export_state(frontier))
+        except Exception as e:
+            print(f"Checkpoint failed: {e}")
+
+    def load_checkpoint(self):
+        """Recharge l'état et les résultats partiels sauvegardés ; False si aucun checkpoint"""
+        state = self.checkpoint.load_state(self.crawl_id) if self.checkpoint else None
+        if not state:
+            return False
+        with self._lock:
+            self.visited = set(state["visited"])
+            self.duplicates = dict(state["duplicates"])
+            for fingerprint, doc_id in state["fingerprints"]:
+                self.fingerprints.find_or_add(fingerprint, doc_id)
+            self.covered_categories = set(state["covered_categories"])
+            self.link_categories = {key: set(cats) for key, cats in state["link_categories"].items()}
+            self.ssl_by_host = dict(state["ssl_by_host"])
+            self.scraped = {result["url"] for result in self.checkpoint.load_results(self.crawl_id)}
+            self._resume_frontier = state["frontier"]
+        print(f"Resuming crawl: {len(self.visited)} pages visited, "
+              f"{len(state['frontier']['entries'])} pending, {len(self.scraped)} scraped")
+        return True
+
+    def clear_checkpoint(self):
+        """Supprime l'état et les résultats sauvegardés de ce crawl"""
+        if self.checkpoint is None:
+            return
+        try:
+            self.checkpoint.clear(self.crawl_id)
+        except Exception as e:
+            print(f"Checkpoint cleanup failed: {e}")
+            return
+        with self._lock:
+            self.scraped.clear()
 
     def get_visited(self):
         """Retourne la liste des URLs visitées"""
         return list(self.visited)
 
+    def get_unique_pages(self):
+        """URLs visitées hors quasi-doublons (pages à scraper et analyser)"""
+        return [url for url in self.visited if url not in self.duplicates]
+
     def get_ssl_info(self):
-        """Retourne la liste des certificats SSL collectés"""
-        return [obj.info for obj in self.ssl_objects]
+        """Retourne la liste des certificats SSL collectés (un par page visitée)"""
+        return [self.get_ssl_for(url) for url in self.get_visited()]
+
+    def get_ssl_for(self, url):
+        """Certificat SSL de l'hôte de la page (jointure par hostname)"""
+        with self._lock:
+            info = self.ssl_by_host.get(urlparse(url).hostname)
+        return {**info, "url": url} if info else {}
+
+    def scrape_one(self, page_url):
+        """Scraping statique (+ dynamique si nécessaire) d'une page, avec son certificat SSL"""
+        static_data, dynamic_data = self.scraper.scrape_page(page_url)
+        result = {
+            "url": page_url,
+            "ssl": self.get_ssl_for(page_url),
+            "static": static_data,
+            "dynamic": dynamic_data
+        }
+        if self.checkpoint is not None:
+            self.checkpoint.save_result(self.crawl_id, page_url, result)
+            with self._lock:
+                self.scraped.add(page_url)
+        return result
 
     def run_scraping(self):
         """Réalise le scraping statique et dynamique sur toutes les pages visitées"""
-        all_results = []
+        return [self.scrape_one(page_url) for page_url in self.get_unique_pages()]
+
+    def stream(self, max_in_flight=2):
+        """
+        Crawl et scraping en pipeline : chaque page est scrapée dès qu'elle a été visitée,
+        au plus `max_in_flight` scrapings en cours, résultats produits au fur et à mesure.
+        Fermer le générateur arrête le crawl.
+        Après une reprise, les résultats déjà sauvegardés sont produits en premier
+        et les pages visitées mais pas encore scrapées sont reprises.
+        Un crawl mené à son terme efface son checkpoint (un nouveau resume() repart de zéro).
+        """
+        pages = queue.Queue()
+        crawl_done = object()
+        crawl_errors = []
+
+        if self.checkpoint is not None and self.scraped:
+            yield from self.checkpoint.load_results(self.crawl_id)
+        for page_url in self.get_unique_pages():
+            if page_url not in self.scraped:
+                pages.put(page_url)
 
-        visited_pages = self.get_visited()
-        ssl_data = self.get_ssl_info()
+        def run_crawl():
+            try:
+                self.crawl(on_page=pages.put)
+            except Exception as e:
+                # Relevée côté consommateur, une fois les pages déjà visitées scrapées
+                crawl_errors.append(e)
+            finally:
+                pages.put(crawl_done)
 
-        for i, page_url in enumerate(visited_pages):
-            static_data = self.scraper.scrape_static(page_url)
-            dynamic_data = self.scraper.scrape_dynamic(page_url)
+        self._stop.clear()
+        crawl_thread = threading.Thread(target=run_crawl, daemon=True)
+        crawl_thread.start()
 
-            ssl_info = ssl_data[i] if i < len(ssl_data) else {}
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            pending = set()
+            crawling = True
+            try:
+                while crawling or pending:
+                    # 🔹 Alimente le scraping sans dépasser max_in_flight
+                    while crawling and len(pending) < max_in_flight:
+                        try:
+                            page_url = pages.get(timeout=0.1 if pending else None)
+                        except queue.Empty:
+                            break
+                        if page_url is crawl_done:
+                            crawling = False
+                        else:
+                            pending.add(executor.submit(self.scrape_one, page_url))
 
-            all_results.append({
-                "url": page_url,
-                "ssl": ssl_info,
-                "static": static_data,
-                "dynamic": dynamic_data
-            })
+                    if pending:
+                        done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
 
-        return all_results
+                # 🔹 Échec du crawl : propagé à l'appelant, le checkpoint est conservé pour la reprise
+                crawl_thread.join()
+                if crawl_errors:
+                    raise crawl_errors[0]
+                # 🔹 Crawl et scraping terminés sans erreur ni arrêt anticipé : plus rien à reprendre
+                self.clear_checkpoint()
+            finally:
+                self._stop.set()
+                for future in pending:
+                    future.cancel()
 
     def run(self):
-        """Enchaîne le crawl et le scraping et retourne tout en mémoire"""
-        self.crawl()
-        results = self.run_scraping()
-        return results
+        """Enchaîne le crawl et le scraping (en pipeline) et retourne tout en mémoire"""
+        return list(self.stream())
 
     def __repr__(self):
         return (
@@ -97,7 +465,8 @@ class WebCrawler:
 
 if __name__ == "__main__":
     url_input = input("Entrez l'URL du site à auditer : ")
-    crawler = WebCrawler(start_url=url_input, max_depth=2, delay=1)
+    # Checkpoint activé : un audit interrompu reprend là où il s'était arrêté
+    crawler = WebCrawler.resume(start_url=url_input, max_depth=2)
     results = crawler.run()
     
     print(json.dumps(results, indent=2, ensure_ascii=False))